@@ -0,0 +1,146 @@
+# election_project/election_app/activity.py
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ActivityLog, ActivityRollup
+
+logger = logging.getLogger(__name__)
+
+
+def log_activity(type, description, icon='fa-info', color='blue'):
+    """Queue an activity log entry; it is written with the next batch.
+
+    Inside a transaction the entry is only queued once it commits.
+    """
+    entry = ActivityLog(type=type, description=description, icon=icon, color=color, time=timezone.now())
+    transaction.on_commit(lambda: activity_queue.put(entry))
+
+
+class ActivityQueue:
+    """In-process buffer of activity log entries, bulk-inserted off the request thread.
+
+    A background thread writes the buffer every ``ACTIVITY_FLUSH_SECONDS``,
+    or as soon as it holds ``ACTIVITY_FLUSH_SIZE`` entries. Entries that
+    can't be written (database down, interpreter shutting down) are appended
+    to the ``ACTIVITY_SPOOL`` file and replayed by the next flush, from any
+    process. Only a hard kill loses what is still buffered.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._entries = []
+        self._thread = None
+
+    def put(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= settings.ACTIVITY_FLUSH_SIZE
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='activity-log', daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.ACTIVITY_FLUSH_SECONDS)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Activity log flush failed')
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write everything buffered or spooled; return the number of entries written."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        entries += _claim_spool()
+        if not entries:
+            return 0
+        try:
+            ActivityLog.objects.bulk_create(entries, batch_size=500)
+        except DatabaseError:
+            logger.warning('Spooling %d activity log entries', len(entries), exc_info=True)
+            _spool(entries)
+            return 0
+        return len(entries)
+
+    def shutdown(self):
+        try:
+            self.flush()
+        except Exception:
+            with self._lock:
+                entries, self._entries = self._entries, []
+            _spool(entries)
+
+
+def _spool(entries):
+    if not entries:
+        return
+    lines = ''.join(
+        json.dumps({'type': e.type, 'description': e.description, 'icon': e.icon, 'color': e.color, 'time': e.time.isoformat()}) + '\n'
+        for e in entries
+    )
+    # One append per batch so lines from concurrent processes don't interleave.
+    with open(settings.ACTIVITY_SPOOL, 'a') as fh:
+        fh.write(lines)
+
+
+def _claim_spool():
+    # Rename before reading so two processes can't both replay the same file.
+    claimed = f'{settings.ACTIVITY_SPOOL}.{uuid.uuid4().hex}'
+    try:
+        os.replace(settings.ACTIVITY_SPOOL, claimed)
+    except FileNotFoundError:
+        return []
+    with open(claimed) as fh:
+        rows = [json.loads(line) for line in fh if line.strip()]
+    os.remove(claimed)
+    return [ActivityLog(**dict(row, time=parse_datetime(row['time']))) for row in rows]
+
+
+activity_queue = ActivityQueue()
+atexit.register(activity_queue.shutdown)
+# A forked worker starts with an empty buffer and no flusher thread of its own.
+os.register_at_fork(after_in_child=activity_queue._reset)
+
+
+def flush_activity():
+    return activity_queue.flush()
+
+
+def rollup_activity(days=None):
+    """Fold entries older than ``days`` into daily per-type counts and delete them.
+
+    Returns the number of entries rolled up. The dashboard only shows the
+    latest few entries, so the detail is kept for ``ACTIVITY_RETENTION_DAYS``.
+    """
+    days = settings.ACTIVITY_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    with transaction.atomic():
+        expired = ActivityLog.objects.filter(time__lt=cutoff)
+        counts = expired.annotate(day=TruncDate('time')).values('day', 'type').annotate(count=Count('id')).order_by()
+        for row in counts:
+            updated = ActivityRollup.objects.filter(day=row['day'], type=row['type']).update(count=F('count') + row['count'])
+            if not updated:
+                ActivityRollup.objects.create(day=row['day'], type=row['type'], count=row['count'])
+        deleted, _ = expired.delete()
+    return deleted
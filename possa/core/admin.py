@@ -1,8 +1,9 @@
 # election_project/election_app/admin.py
 from django.contrib import admin
-from .models import ElectionSetting, Candidate, Voter, ActivityLog
+from .models import ElectionSetting, Candidate, Voter, ActivityLog, ActivityRollup
 
 admin.site.register(ElectionSetting)
 admin.site.register(Candidate)
 admin.site.register(Voter)
 admin.site.register(ActivityLog)
+admin.site.register(ActivityRollup)
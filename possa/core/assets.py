@@ -0,0 +1,35 @@
+# election_project/election_app/assets.py
+import functools
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+# Third-party CSS/JS the templates use: {name: (static path, pinned CDN URL)}.
+# `manage.py vendor_assets` downloads them under static/vendor/ so collectstatic
+# can hash and compress them; until then pages fall back to the CDN.
+VENDOR_ASSETS = {
+    'tailwind': ('vendor/tailwindcss/tailwind.js', 'https://cdn.tailwindcss.com/3.4.16'),
+    'fontawesome': ('vendor/fontawesome/css/all.min.css',
+                    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css'),
+    'chartjs': ('vendor/chartjs/chart.umd.min.js', 'https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js'),
+}
+
+
+@functools.cache
+def asset_url(name):
+    """URL for a vendored asset: the local (hashed) copy once it exists, else the CDN.
+
+    With DEBUG on, the source copy is enough; otherwise it must have been
+    collected into STATIC_ROOT, which is where it is served from.
+    """
+    path, cdn_url = VENDOR_ASSETS[name]
+    local = finders.find(path) if settings.DEBUG else staticfiles_storage.exists(path)
+    return static(path) if local else cdn_url
+
+
+@functools.cache
+def hashed_static_names():
+    """Names collectstatic gave content-hashed copies, from its manifest."""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
@@ -0,0 +1,220 @@
+# election_project/election_app/auth.py
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.contrib.auth import aauthenticate, alogin, authenticate, login as django_login
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+
+from .election import aelection_open, election_open
+from .hashers import VoterPasswordHasher, hash_voter_password, run_hasher
+from .models import Voter
+from .versions import state_cache
+
+ADMIN_EXISTS_KEY = 'auth:admin-exists'
+
+
+class LoginThrottled(Exception):
+    pass
+
+
+def _credential_key(dept_id, password):
+    digest = hmac.new(settings.SECRET_KEY.encode(), f'{dept_id}\0{password}'.encode(), hashlib.sha256).hexdigest()
+    return f'login:token:{digest}'
+
+
+def _fingerprint(encoded):
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _attempts_key(request, dept_id):
+    # Counted per client as well, so failing on purpose from one address can't
+    # lock a voter out everywhere else.
+    address = request.META.get('REMOTE_ADDR', '') if request is not None else ''
+    digest = hashlib.sha256(f'{address}\0{dept_id}'.encode()).hexdigest()
+    return f'login:attempts:{digest}'
+
+
+class VoterBackend:
+    """Authenticate voters by ``dept_id`` and password.
+
+    Voters aren't ``auth.User`` rows, so this isn't listed in
+    ``AUTHENTICATION_BACKENDS``; the login views call it directly and keep
+    the voter in the session themselves. Two things keep hashing off the
+    hot path when a queue of voters logs in at once:
+
+    * a successful check leaves a short-lived login token in the state cache,
+      keyed by an HMAC of the credentials, so a retry within
+      ``VOTER_LOGIN_TOKEN_TTL`` seconds (election not open yet, browser
+      back button) skips the hasher;
+    * failed attempts are counted per ``dept_id`` and client address and, past
+      ``VOTER_LOGIN_ATTEMPTS`` in ``VOTER_LOGIN_WINDOW`` seconds, rejected
+      before hashing.
+    """
+
+    def authenticate(self, request, dept_id=None, password=None):
+        if not dept_id or password is None:
+            return None
+        attempts_key = _attempts_key(request, dept_id)
+        if state_cache.get(attempts_key, 0) >= settings.VOTER_LOGIN_ATTEMPTS:
+            raise LoginThrottled
+        voter = Voter.objects.filter(dept_id=dept_id).first()
+        if voter is None:
+            # Hash anyway so unknown ids take as long as wrong passwords.
+            hash_voter_password(password)
+        else:
+            token_key = _credential_key(dept_id, password)
+            # The token is tied to the stored hash, so a password reset invalidates it.
+            if state_cache.get(token_key) == _fingerprint(voter.password) or self._check(voter, password):
+                state_cache.set(token_key, _fingerprint(voter.password), settings.VOTER_LOGIN_TOKEN_TTL)
+                state_cache.delete(attempts_key)
+                return voter
+        self._failed(attempts_key)
+        return None
+
+    async def aauthenticate(self, request, dept_id=None, password=None):
+        # Same steps as authenticate(), with hashing on the hasher threads.
+        if not dept_id or password is None:
+            return None
+        attempts_key = _attempts_key(request, dept_id)
+        if await state_cache.aget(attempts_key, 0) >= settings.VOTER_LOGIN_ATTEMPTS:
+            raise LoginThrottled
+        voter = await Voter.objects.filter(dept_id=dept_id).afirst()
+        if voter is None:
+            await run_hasher(hash_voter_password, password)
+        else:
+            token_key = _credential_key(dept_id, password)
+            if await state_cache.aget(token_key) == _fingerprint(voter.password) or await self._acheck(voter, password):
+                await state_cache.aset(token_key, _fingerprint(voter.password), settings.VOTER_LOGIN_TOKEN_TTL)
+                await state_cache.adelete(attempts_key)
+                return voter
+        await self._afailed(attempts_key)
+        return None
+
+    def _check(self, voter, password):
+        ok, upgraded = _verify(voter.password, password)
+        if upgraded:
+            # Upgrade to the current voter profile without firing the model signals.
+            voter.password = upgraded
+            Voter.objects.filter(pk=voter.pk).update(password=upgraded)
+        return ok
+
+    async def _acheck(self, voter, password):
+        ok, upgraded = await run_hasher(_verify, voter.password, password)
+        if upgraded:
+            voter.password = upgraded
+            await Voter.objects.filter(pk=voter.pk).aupdate(password=upgraded)
+        return ok
+
+    def _failed(self, attempts_key):
+        if state_cache.add(attempts_key, 1, settings.VOTER_LOGIN_WINDOW):
+            return
+        try:
+            state_cache.incr(attempts_key)
+        except ValueError:
+            # Expired between add() and incr().
+            state_cache.add(attempts_key, 1, settings.VOTER_LOGIN_WINDOW)
+
+    async def _afailed(self, attempts_key):
+        if await state_cache.aadd(attempts_key, 1, settings.VOTER_LOGIN_WINDOW):
+            return
+        try:
+            await state_cache.aincr(attempts_key)
+        except ValueError:
+            await state_cache.aadd(attempts_key, 1, settings.VOTER_LOGIN_WINDOW)
+
+
+def _verify(encoded, password):
+    """Check ``password`` against ``encoded``; return ``(ok, new hash if it needs upgrading)``."""
+    upgraded = []
+    ok = check_password(password, encoded, lambda raw: upgraded.append(hash_voter_password(raw)),
+                        preferred=VoterPasswordHasher.algorithm)
+    return ok, upgraded[0] if upgraded else None
+
+
+def authenticate_voter(request, dept_id, password):
+    return VoterBackend().authenticate(request, dept_id=dept_id, password=password)
+
+
+async def aauthenticate_voter(request, dept_id, password):
+    return await VoterBackend().aauthenticate(request, dept_id=dept_id, password=password)
+
+
+def admin_exists():
+    """Whether the first admin has been set up; only a positive answer is cached."""
+    if state_cache.get(ADMIN_EXISTS_KEY):
+        return True
+    exists = User.objects.exists()
+    if exists:
+        state_cache.set(ADMIN_EXISTS_KEY, True, None)
+    return exists
+
+
+async def aadmin_exists():
+    if await state_cache.aget(ADMIN_EXISTS_KEY):
+        return True
+    exists = await User.objects.aexists()
+    if exists:
+        await state_cache.aset(ADMIN_EXISTS_KEY, True, None)
+    return exists
+
+
+class LoginFailed(Exception):
+    pass
+
+
+def log_in(request):
+    """Log in the voter or admin posted by the login forms; return the URL name to redirect to.
+
+    Raises ``LoginFailed`` with the message to show. A failed attempt costs
+    a single query.
+    """
+    role = request.POST.get('role')
+    password = request.POST.get('password')
+    if role == 'voter':
+        try:
+            voter = authenticate_voter(request, request.POST.get('dept_id'), password)
+        except LoginThrottled:
+            raise LoginFailed('Too many attempts, please try again later')
+        if voter is None:
+            raise LoginFailed('Invalid credentials')
+        if voter.has_voted:
+            raise LoginFailed('You have already voted')
+        if not election_open():
+            raise LoginFailed('Election is not ongoing')
+        request.session['voter_id'] = voter.id
+        return 'voter_dashboard'
+    if role == 'admin':
+        user = authenticate(request, username=request.POST.get('username'), password=password)
+        if user is None:
+            raise LoginFailed('Invalid credentials')
+        django_login(request, user)
+        return 'dashboard'
+    raise LoginFailed('Invalid credentials')
+
+
+async def alog_in(request):
+    """``log_in()`` for async views."""
+    role = request.POST.get('role')
+    password = request.POST.get('password')
+    if role == 'voter':
+        try:
+            voter = await aauthenticate_voter(request, request.POST.get('dept_id'), password)
+        except LoginThrottled:
+            raise LoginFailed('Too many attempts, please try again later')
+        if voter is None:
+            raise LoginFailed('Invalid credentials')
+        if voter.has_voted:
+            raise LoginFailed('You have already voted')
+        if not await aelection_open():
+            raise LoginFailed('Election is not ongoing')
+        await request.session.aset('voter_id', voter.id)
+        return 'voter_dashboard'
+    if role == 'admin':
+        user = await aauthenticate(request, username=request.POST.get('username'), password=password)
+        if user is None:
+            raise LoginFailed('Invalid credentials')
+        await alogin(request, user)
+        return 'dashboard'
+    raise LoginFailed('Invalid credentials')
@@ -0,0 +1,51 @@
+# election_project/election_app/avatars.py
+import colorsys
+import hashlib
+import re
+from xml.sax.saxutils import escape
+
+from django.utils.http import quote_etag
+
+AVATAR_SIZE = 64
+AVATAR_MAX_AGE = 60 * 60 * 24 * 365
+HEX_COLOR = re.compile(r'^(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+
+
+def initials(name):
+    words = name.split()
+    return ''.join(word[0] for word in words[:2]).upper() or '?'
+
+
+def _hex(value, default):
+    return f'#{value.lower()}' if value and HEX_COLOR.match(value) else default
+
+
+def _name_color(name):
+    # 'random' (the old ui-avatars default) becomes one of 36 stable hues per name.
+    hue = int(hashlib.md5(name.encode()).hexdigest()[:4], 16) % 36 / 36
+    r, g, b = colorsys.hls_to_rgb(hue, 0.45, 0.55)
+    return f'#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}'
+
+
+def render_avatar(text, background, color):
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{AVATAR_SIZE}" height="{AVATAR_SIZE}" viewBox="0 0 64 64">'
+        f'<rect width="64" height="64" fill="{background}"/>'
+        f'<text x="50%" y="50%" dy=".35em" fill="{color}" font-family="Helvetica,Arial,sans-serif" '
+        f'font-size="26" text-anchor="middle">{escape(text)}</text>'
+        f'</svg>'
+    )
+
+
+def avatar_svg(name, background=None, color=None):
+    """Return ``(svg, etag)`` for the initials avatar drawn for these parameters.
+
+    Rendering is a string format, so nothing is stored: arbitrary names from
+    anonymous clients can't fill the disk. The ETag is a hash of what is
+    drawn (initials and colours), the same in every worker.
+    """
+    text = initials(name)
+    background = _hex(background, None) or _name_color(name)
+    color = _hex(color, '#ffffff')
+    etag = quote_etag(hashlib.sha256(f'{text}\0{background}\0{color}'.encode()).hexdigest()[:32])
+    return render_avatar(text, background, color), etag
@@ -0,0 +1,73 @@
+# election_project/election_app/ballots.py
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .models import Candidate
+from .versions import acurrent_version, bump_version, current_version
+
+BALLOT_KEY = 'ballot:races'
+BALLOT_TIMEOUT = 60 * 60
+
+
+def candidates_version():
+    return current_version('candidates')
+
+
+async def acandidates_version():
+    return await acurrent_version('candidates')
+
+
+def bump_candidates_version():
+    return bump_version('candidates')
+
+
+def ballot_races():
+    """Return ``[(position, [candidate dicts])]`` for the ballot, built once per candidate-set version."""
+    version = candidates_version()
+    entry = cache.get(BALLOT_KEY)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    races = {}
+    for candidate in Candidate.objects.order_by('position', 'pk'):
+        races.setdefault(candidate.position, []).append({
+            'id': candidate.id,
+            'name': candidate.name,
+            'department': candidate.department,
+            'position': candidate.position,
+            'photo': candidate.photo_variants,
+            'party_photo': candidate.party_photo_variants,
+        })
+    races = list(races.items())
+    # One entry, overwritten when the candidate set changes.
+    cache.set(BALLOT_KEY, (version, races), BALLOT_TIMEOUT)
+    return races
+
+
+async def aballot_races():
+    version = await acandidates_version()
+    entry = await cache.aget(BALLOT_KEY)
+    if entry is None or entry[0] != version:
+        return await sync_to_async(ballot_races)()
+    return entry[1]
+
+
+class InvalidBallot(Exception):
+    pass
+
+
+def validate_ballot(selections):
+    """Check ``{position: candidate id}`` against the ballot; return the chosen candidate dicts.
+
+    Races may be left blank, but at least one must be filled and each
+    choice must be a candidate standing for that position.
+    """
+    races = dict(ballot_races())
+    chosen = []
+    for position, candidate_id in selections.items():
+        by_id = {str(c['id']): c for c in races.get(position, ())}
+        if str(candidate_id) not in by_id:
+            raise InvalidBallot(f'Invalid choice for {position}')
+        chosen.append(by_id[str(candidate_id)])
+    if not chosen:
+        raise InvalidBallot('Please select a candidate')
+    return chosen
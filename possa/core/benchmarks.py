@@ -0,0 +1,532 @@
+# election_project/election_app/benchmarks.py
+import asyncio
+import contextlib
+import importlib.util
+import os
+import random
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from .activity import flush_activity
+from .exports import EXPORTS, FORMATS
+from .hashers import hash_voter_password
+from .results import turnout
+from .models import ElectionSetting, Candidate, Ballot, Tally, Voter
+from .tallies import materialize
+
+SCENARIOS = {}
+
+BENCH_PASSWORD = 'benchmark'
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def scratch_caches(name):
+    """Settings override giving every cache alias a fresh, private in-memory store."""
+    return override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'{name}-{alias}'}
+        for alias in settings.CACHES
+    })
+
+
+@contextlib.contextmanager
+def scratch_database():
+    """Run a benchmark against a throwaway database, cache, media and reports directory, never the live election.
+
+    SQLite test databases default to in-memory, which serializes threads very
+    differently from a real deployment, so they are put in a temporary file.
+    """
+    tmpdir = tempfile.mkdtemp()
+    if connection.vendor == 'sqlite':
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmpdir, 'benchmark.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    scratch_settings = override_settings(
+        MEDIA_ROOT=os.path.join(tmpdir, 'media'),
+        REPORTS_DIR=os.path.join(tmpdir, 'reports'),
+        ACTIVITY_SPOOL=os.path.join(tmpdir, 'activity.spool'),
+    )
+    caches = scratch_caches('benchmark')
+    scratch_settings.enable()
+    caches.enable()
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        flush_activity()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        caches.disable()
+        scratch_settings.disable()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def race_name(race):
+    return 'President' if race == 0 else f'Seat {race}'
+
+
+def seed_election(voters, candidates, races=1):
+    now = timezone.now()
+    ElectionSetting.objects.create(start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+    Candidate.objects.bulk_create(
+        Candidate(name=f'Candidate {race}.{i}', department='Bench', position=race_name(race))
+        for race in range(races)
+        for i in range(candidates)
+    )
+    seed_voters(0, voters)
+
+
+def seed_voters(start, stop, password=None, voted_every=0):
+    password = password or make_password(BENCH_PASSWORD)
+    statuses = ['Freshman', 'Sophomore', 'Junior', 'Senior']
+    Voter.objects.bulk_create(
+        (
+            Voter(name=f'Voter {i}', sex='Other', status=statuses[i % 4], major_minor='Major' if i % 3 else 'Minor',
+                  department='Bench', dept_id=f'B{i:07d}', password=password,
+                  has_voted=bool(voted_every) and i % voted_every == 0)
+            for i in range(start, stop)
+        ),
+        batch_size=1000,
+    )
+
+
+def reset_ballots():
+    Voter.objects.update(has_voted=False)
+    Ballot.objects.all().delete()
+    Tally.objects.all().delete()
+
+
+def voter_client(voter_id):
+    client = Client()
+    session = client.session
+    session['voter_id'] = voter_id
+    session.save()
+    return client
+
+
+def latency_summary(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def run_concurrently(func, items, workers):
+    """Call ``func`` on every item from ``workers`` threads; return (timings, errors, wall seconds)."""
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            ok = func(item)
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(timed, items))
+    wall = time.perf_counter() - started
+    timings = [elapsed for elapsed, ok in results if ok]
+    return timings, len(results) - len(timings), wall
+
+
+@scenario('votes')
+def bench_votes(options):
+    """Fire one ballot per voter at ``vote/`` concurrently and check no vote was lost."""
+    seed_election(options['voters'], options['candidates'], options['races'])
+    races = {}
+    for pk, position in Candidate.objects.values_list('pk', 'position'):
+        races.setdefault(f'ballot-{position}', []).append(pk)
+    voter_ids = list(Voter.objects.values_list('pk', flat=True))
+    url = reverse('voter_dashboard')
+    runs = []
+    for workers in options['workers']:
+        reset_ballots()
+        ballots = [
+            (voter_client(pk), {field: random.choice(choices) for field, choices in races.items()})
+            for pk in voter_ids
+        ]
+
+        def submit(ballot):
+            client, selections = ballot
+            response = client.post(url, selections)
+            return response.status_code == 200 and bool(response.context.get('success'))
+
+        timings, errors, wall = run_concurrently(submit, ballots, workers)
+        materialize()
+        counted = Tally.objects.aggregate(total=Sum('votes'))['total'] or 0
+        voted = Voter.objects.filter(has_voted=True).count()
+        runs.append({
+            'workers': workers,
+            'accepted': len(timings),
+            'errors': errors,
+            'ballots_per_second': round(len(timings) / wall, 1),
+            'latency': latency_summary(timings),
+            'counted': counted,
+            'voters_marked': voted,
+            'lost_updates': voted * len(races) - counted,
+        })
+    return {'voters': len(voter_ids), 'races': len(races), 'candidates': options['candidates'], 'runs': runs}
+
+
+@scenario('export')
+def bench_export(options):
+    """Stream the voter roll through ``export/`` and measure throughput and peak memory."""
+    seed_election(options['voters'], options['candidates'])
+    client = Client()
+    client.force_login(User.objects.create_user('benchmark-admin'))
+    report = {'voters': options['voters']}
+    for fmt in FORMATS:
+        url = reverse('export', args=['voters', fmt])
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in client.get(url).streaming_content)
+        wall = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report[fmt] = {
+            'bytes': size,
+            'seconds': round(wall, 3),
+            'rows_per_second': round(options['voters'] / wall, 1),
+            'peak_memory_kib': peak // 1024,
+        }
+    # Baseline: what holding the whole roll in memory at once costs.
+    tracemalloc.start()
+    rows = list(Voter.objects.values_list(*EXPORTS['voters'][1]))
+    report['materialized_peak_memory_kib'] = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    del rows
+    return report
+
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 3)
+
+
+def _turnout_grouped():
+    # The three queries the results views used to run.
+    voted = Voter.objects.filter(has_voted=True)
+    list(voted.values('status').annotate(count=Count('status')))
+    list(voted.values('major_minor').annotate(count=Count('major_minor')))
+    voted.count()
+
+
+@scenario('turnout')
+def bench_turnout(options):
+    """Time the turnout breakdown as the roll grows by 10x steps from 1k up to --voters."""
+    seed_election(0, options['candidates'])
+    password = make_password(BENCH_PASSWORD)
+    sizes = []
+    size = 1000
+    while size <= options['voters']:
+        sizes.append(size)
+        size *= 10
+    report = {'runs': []}
+    seeded = 0
+    for size in sizes:
+        seed_voters(seeded, size, password, voted_every=2)
+        seeded = size
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        report['runs'].append({
+            'voters': size,
+            'grouped_queries_ms': _best_of(_turnout_grouped),
+            'single_query_ms': _best_of(turnout),
+        })
+    return report
+
+
+@scenario('login')
+def bench_login(options):
+    """Log every voter in concurrently, cold and then retried with login tokens warm."""
+    seed_election(0, options['candidates'])
+    seed_voters(0, options['voters'], hash_voter_password(BENCH_PASSWORD))
+    report = {'voters': options['voters'], 'hasher_ms': {}, 'runs': []}
+    for name, encoded in [
+        (f'pbkdf2_sha256 x{PBKDF2PasswordHasher.iterations}', make_password(BENCH_PASSWORD, hasher='pbkdf2_sha256')),
+        (f'pbkdf2_voter x{settings.VOTER_HASHER_ITERATIONS}', hash_voter_password(BENCH_PASSWORD)),
+    ]:
+        report['hasher_ms'][name] = _best_of(lambda: check_password(BENCH_PASSWORD, encoded), repeat=3)
+    url = reverse('login')
+    dept_ids = list(Voter.objects.values_list('dept_id', flat=True))
+
+    def login(dept_id):
+        response = Client().post(url, {'role': 'voter', 'dept_id': dept_id, 'password': BENCH_PASSWORD})
+        return response.status_code == 302
+
+    for workers in options['workers']:
+        # Each run starts with no login tokens or throttle counters.
+        with scratch_caches(f'login-{len(report["runs"])}'):
+            for phase in ('cold', 'retry'):
+                timings, errors, wall = run_concurrently(login, dept_ids, workers)
+                report['runs'].append({
+                    'workers': workers,
+                    'phase': phase,
+                    'accepted': len(timings),
+                    'errors': errors,
+                    'logins_per_second': round(len(timings) / wall, 1),
+                    'latency': latency_summary(timings),
+                })
+    return report
+
+
+class EndpointRecorder:
+    """Collect latency and query counts per endpoint from many client threads."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def request(self, endpoint, send, ok=lambda response: response.status_code == 200):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = send()
+            elapsed = time.perf_counter() - started
+        with self.lock:
+            if ok(response):
+                self.samples[endpoint].append((elapsed, len(queries)))
+            else:
+                self.errors[endpoint] += 1
+        return response
+
+    def summary(self, wall):
+        report = {}
+        for endpoint in sorted(set(self.samples) | set(self.errors)):
+            samples = self.samples[endpoint]
+            counts = [count for _, count in samples]
+            report[endpoint] = {
+                'requests': len(samples),
+                'errors': self.errors[endpoint],
+                'requests_per_second': round(len(samples) / wall, 1),
+                'latency': latency_summary([elapsed for elapsed, _ in samples]),
+                'queries': {'mean': round(statistics.fmean(counts), 2), 'max': max(counts)} if counts else {},
+            }
+        return report
+
+
+@scenario('workflow')
+def bench_workflow(options):
+    """Drive the whole election through its URLs: every voter loads the login page,
+    logs in, loads and casts a ballot, while ``--pollers`` admins poll the results
+    JSON. Reports latency and query counts per endpoint.
+    """
+    seed_election(0, options['candidates'], options['races'])
+    seed_voters(0, options['voters'], hash_voter_password(BENCH_PASSWORD))
+    admin = User.objects.create_superuser('benchmark-admin', password=BENCH_PASSWORD)
+    races = {}
+    for pk, position in Candidate.objects.values_list('pk', 'position'):
+        races.setdefault(f'ballot-{position}', []).append(pk)
+    dept_ids = list(Voter.objects.values_list('dept_id', flat=True))
+    login_url, ballot_url, results_url = reverse('login'), reverse('voter_dashboard'), reverse('results_json')
+    voted = lambda response: response.status_code == 200 and bool(response.context.get('success'))
+    runs = []
+    for workers in options['workers']:
+        reset_ballots()
+        # Fresh caches, so the run starts from new versions and no login tokens.
+        with scratch_caches(f'workflow-{len(runs)}'):
+            recorder = EndpointRecorder()
+            done = threading.Event()
+
+            def vote(dept_id):
+                client = Client()
+                recorder.request('login_page', lambda: client.get(login_url))
+                response = recorder.request('login', lambda: client.post(login_url, {
+                    'role': 'voter', 'dept_id': dept_id, 'password': BENCH_PASSWORD,
+                }), ok=lambda response: response.status_code == 302)
+                if response.status_code != 302:
+                    return False
+                recorder.request('ballot_page', lambda: client.get(ballot_url))
+                selections = {field: random.choice(choices) for field, choices in races.items()}
+                return voted(recorder.request('ballot', lambda: client.post(ballot_url, selections), ok=voted))
+
+            def poll():
+                client = Client()
+                client.force_login(admin)
+                etag = None
+                while not done.is_set():
+                    headers = {'If-None-Match': etag} if etag else {}
+                    response = recorder.request('results_json', lambda: client.get(results_url, headers=headers),
+                                                ok=lambda response: response.status_code in (200, 304))
+                    etag = response.headers.get('ETag', etag)
+                    done.wait(options['poll_interval'])
+
+            pollers = [threading.Thread(target=poll) for _ in range(options['pollers'])]
+            for thread in pollers:
+                thread.start()
+            try:
+                timings, errors, wall = run_concurrently(vote, dept_ids, workers)
+            finally:
+                done.set()
+                for thread in pollers:
+                    thread.join()
+            runs.append({
+                'workers': workers,
+                'pollers': options['pollers'],
+                'voters_completed': len(timings),
+                'errors': errors,
+                'voters_per_second': round(len(timings) / wall, 1),
+                'flow_latency': latency_summary(timings),
+                'endpoints': recorder.summary(wall),
+            })
+    return {'voters': len(dept_ids), 'races': len(races), 'candidates': options['candidates'], 'runs': runs}
+
+
+# Each server runs as ``python -m <module> ...`` with {port} filled in. uvicorn's
+# own WSGI interface can't carry Django's Set-Cookie headers, so the sync views
+# are served the usual way, by gunicorn with a thread per request.
+SERVERS = {
+    'asgi': (['uvicorn', '--port', '{port}', '--log-level', 'warning', 'election.asgi:application'],
+             {'ASYNC_VIEWS': '1'}),
+    'wsgi': (['gunicorn', '--bind', '127.0.0.1:{port}', '--worker-class', 'gthread', '--threads', '16',
+              '--log-level', 'warning', 'election.wsgi:application'],
+             {'ASYNC_VIEWS': '0'}),
+}
+
+CSRF_FIELD = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+@contextlib.contextmanager
+def http_server(command, env):
+    """Serve the scratch database from a server subprocess; yield its base URL."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    cache_dir = tempfile.mkdtemp()
+    env = {**os.environ, **env, 'SQLITE_PATH': str(connection.settings_dict['NAME']), 'CACHE_DIR': cache_dir}
+    process = subprocess.Popen(
+        [sys.executable, '-m', *(arg.format(port=port) for arg in command)],
+        cwd=settings.BASE_DIR, env=env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=1):
+                    break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f'{command[0]} did not start')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+async def _vote_flow(client, dept_id, ballot):
+    """Log a voter in and cast their ballot over HTTP, as a browser would."""
+    page = await client.get('/login/')
+    token = CSRF_FIELD.search(page.text).group(1)
+    response = await client.post('/login/', data={
+        'csrfmiddlewaretoken': token, 'role': 'voter', 'dept_id': dept_id, 'password': BENCH_PASSWORD,
+    })
+    if response.status_code != 302:
+        return False
+    page = await client.get('/vote/')
+    token = CSRF_FIELD.search(page.text).group(1)
+    response = await client.post('/vote/', data={'csrfmiddlewaretoken': token, **ballot})
+    return response.status_code == 200 and 'Vote Cast Successfully' in response.text
+
+
+async def _drive(base_url, dept_ids, ballots, workers):
+    import httpx
+
+    gate = asyncio.Semaphore(workers)
+
+    async def flow(dept_id):
+        async with gate:
+            started = time.perf_counter()
+            try:
+                async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                    ok = await _vote_flow(client, dept_id, random.choice(ballots))
+            except (httpx.HTTPError, AttributeError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(flow(dept_id) for dept_id in dept_ids))
+    wall = time.perf_counter() - started
+    timings = [elapsed for elapsed, ok in results if ok]
+    return timings, len(results) - len(timings), wall
+
+
+@scenario('servers')
+def bench_servers(options):
+    """Run the login-and-vote flow over HTTP against the async views under uvicorn
+    (ASGI) and the sync views under gunicorn (WSGI), at each concurrency level.
+
+    Every run gets its own slice of voters, so ``--voters`` is split evenly
+    across the servers and concurrency levels.
+    """
+    seed_election(0, options['candidates'], options['races'])
+    seed_voters(0, options['voters'], hash_voter_password(BENCH_PASSWORD))
+    # The login page sends everyone to admin setup until an admin exists.
+    User.objects.create_superuser('admin', password=BENCH_PASSWORD)
+    races = {}
+    for candidate_id, position in Candidate.objects.values_list('id', 'position'):
+        races.setdefault(position, []).append(candidate_id)
+    ballots = [
+        {f'ballot-{position}': str(random.choice(ids)) for position, ids in races.items()}
+        for _ in range(50)
+    ]
+    dept_ids = list(Voter.objects.order_by('id').values_list('dept_id', flat=True))
+    per_run = len(dept_ids) // (len(SERVERS) * len(options['workers']))
+    report = {'voters_per_run': per_run, 'races': len(races), 'runs': []}
+    for server, (command, env) in SERVERS.items():
+        if importlib.util.find_spec(command[0]) is None:
+            report['runs'].append({'server': server, 'skipped': f'{command[0]} is not installed'})
+            continue
+        with http_server(command, env) as base_url:
+            for workers in options['workers']:
+                batch, dept_ids = dept_ids[:per_run], dept_ids[per_run:]
+                timings, errors, wall = asyncio.run(_drive(base_url, batch, ballots, workers))
+                report['runs'].append({
+                    'server': server,
+                    'concurrency': workers,
+                    'voted': len(timings),
+                    'errors': errors,
+                    'votes_per_second': round(len(timings) / wall, 1),
+                    'latency': latency_summary(timings),
+                })
+    report['ballots_recorded'] = Voter.objects.filter(has_voted=True).count()
+    return report
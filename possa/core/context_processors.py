@@ -0,0 +1,8 @@
+# election_project/election_app/context_processors.py
+from .election import election_settings, settings_version
+
+
+def chrome(request):
+    # Passed uncalled: templates only resolve them when the cached sidebar in
+    # base.html has to be rebuilt, so other pages pay nothing.
+    return {'chrome_settings': election_settings, 'chrome_version': settings_version}
@@ -0,0 +1,61 @@
+# election_project/election_app/election.py
+import threading
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .models import ElectionSetting
+from .versions import acurrent_version, bump_version, current_version
+
+_lock = threading.Lock()
+_cached = (None, None)  # (version, ElectionSetting)
+
+
+def settings_version():
+    return current_version('election-settings')
+
+
+def bump_settings_version():
+    return bump_version('election-settings')
+
+
+def election_settings():
+    """Return the ElectionSetting row, cached in this process until it is saved.
+
+    Saves anywhere bump a shared version key (see ``core.signals``), so other
+    workers pick up the change on their next call. Treat the instance as
+    read-only; edit a fresh ``ElectionSetting.load()`` instead.
+    """
+    global _cached
+    version = settings_version()
+    cached_version, settings = _cached
+    if cached_version != version:
+        with _lock:
+            cached_version, settings = _cached
+            if cached_version != version:
+                settings = ElectionSetting.load()
+                _cached = (version, settings)
+    return settings
+
+
+async def aelection_settings():
+    global _cached
+    version = await acurrent_version('election-settings')
+    cached_version, settings = _cached
+    if cached_version != version:
+        settings = await sync_to_async(ElectionSetting.load)()
+        _cached = (version, settings)
+    return settings
+
+
+def election_open(now=None):
+    """Whether voting is open right now; no query once the settings are cached."""
+    settings = election_settings()
+    now = now or timezone.now()
+    return settings.start_date <= now <= settings.end_date
+
+
+async def aelection_open(now=None):
+    settings = await aelection_settings()
+    now = now or timezone.now()
+    return settings.start_date <= now <= settings.end_date
@@ -0,0 +1,59 @@
+# election_project/election_app/exports.py
+import csv
+import json
+
+from .models import Candidate, Voter, ActivityLog, Ballot
+from .routing import replica_alias
+
+CHUNK_SIZE = 2000
+
+# Password hashes and photo paths are never exported.
+EXPORTS = {
+    'voters': (lambda: Voter.objects.all(),
+               ['id', 'name', 'sex', 'status', 'major_minor', 'department', 'dept_id', 'has_voted']),
+    'candidates': (lambda: Candidate.objects.with_votes(),
+                   ['id', 'name', 'department', 'position', 'votes']),
+    'activity': (lambda: ActivityLog.objects.all(),
+                 ['id', 'type', 'description', 'time', 'icon', 'color']),
+    'ballots': (lambda: Ballot.objects.all(),
+                ['id', 'voter_id', 'candidate_id', 'position', 'cast_at']),
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    # csv.writer wants a file; this one hands each formatted line back.
+    def write(self, value):
+        return value
+
+
+def export_rows(dataset):
+    queryset, fields = EXPORTS[dataset]
+    # Exports tolerate a replica up to REPLICA_MAX_LAG behind; the alias is
+    # fixed up front because the rows are read while the response streams.
+    rows = queryset().using(replica_alias()).order_by('pk').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    return fields, rows
+
+
+def export_lines(dataset, fmt):
+    """Yield the export of ``dataset`` in ``fmt`` in chunks, holding at most CHUNK_SIZE rows in memory."""
+    fields, rows = export_rows(dataset)
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        encode = writer.writerow
+        yield encode(fields)
+    else:
+        def encode(row):
+            return json.dumps(dict(zip(fields, row)), default=str) + '\n'
+    batch = []
+    for row in rows:
+        batch.append(encode(row))
+        if len(batch) == CHUNK_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
@@ -0,0 +1,51 @@
+# election_project/election_app/hashers.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+
+
+class VoterPasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 with its own work factor for one-time voter credentials.
+
+    Voter passwords only need to survive for the length of an election, so
+    they get a cheaper profile than admin accounts (``VOTER_HASHER_ITERATIONS``,
+    see ``manage.py benchmark login``). Changing the setting is picked up on
+    each voter's next successful login.
+    """
+    algorithm = 'pbkdf2_voter'
+
+    @property
+    def iterations(self):
+        return settings.VOTER_HASHER_ITERATIONS
+
+
+def hash_voter_password(raw_password):
+    return make_password(raw_password, hasher=VoterPasswordHasher.algorithm)
+
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.HASH_WORKERS, thread_name_prefix='hashers')
+    return _executor
+
+
+async def run_hasher(func, *args):
+    """Run a hashing call on the hasher threads so it doesn't block the event loop.
+
+    PBKDF2 releases the GIL, so on a multi-core host these run in parallel.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+
+
+def hash_voter_passwords(raw_passwords):
+    """Hash a batch of voter passwords across the hasher threads (bulk imports)."""
+    return list(_get_executor().map(hash_voter_password, raw_passwords))
@@ -0,0 +1,105 @@
+# election_project/election_app/images.py
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Square thumbnails: photos render at 32-64px, so 64 covers 1x and 128 covers 2x.
+THUMB_SIZES = (64, 128)
+FORMATS = (('jpg', 'JPEG'), ('webp', 'WEBP'))
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def derivative_name(name, size, ext):
+    root, _ = os.path.splitext(name)
+    return f'thumbs/{root}.{size}.{ext}'
+
+
+def _ready_marker(name):
+    # Written last, so once it exists every derivative does.
+    return derivative_name(name, THUMB_SIZES[0], 'webp')
+
+
+def thumbnails_ready(name):
+    return default_storage.exists(_ready_marker(name))
+
+
+def image_variants(field):
+    """Return ``{'src', 'srcset'}`` for an image field, or None when it's empty.
+
+    ``src`` is the small JPEG and ``srcset`` the WebP thumbnails by width;
+    until the pipeline has caught up with a fresh upload, the original is
+    served with no ``srcset``.
+    """
+    if not field:
+        return None
+    if not thumbnails_ready(field.name):
+        return {'src': field.url, 'srcset': ''}
+    def url(size, ext):
+        return default_storage.url(derivative_name(field.name, size, ext))
+
+    return {
+        'src': url(THUMB_SIZES[0], 'jpg'),
+        'srcset': ', '.join(f'{url(size, "webp")} {size}w' for size in THUMB_SIZES),
+    }
+
+
+def build_derivatives(name):
+    """Write every thumbnail of the stored image ``name``; return how many were written."""
+    with default_storage.open(name) as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image = image.convert('RGB')
+    written = 0
+    # Largest first, so the smallest WebP (the ready marker) comes last.
+    for size in reversed(THUMB_SIZES):
+        thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        for ext, fmt in FORMATS:
+            buffer = io.BytesIO()
+            thumb.save(buffer, fmt, quality=80, optimize=fmt == 'JPEG')
+            target = derivative_name(name, size, ext)
+            default_storage.delete(target)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+            written += 1
+    return written
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix='images')
+    return _executor
+
+
+def _build(name, on_done):
+    try:
+        build_derivatives(name)
+    except Exception:
+        logger.exception('Could not build thumbnails for %s', name)
+    else:
+        if on_done:
+            on_done()
+    finally:
+        with _lock:
+            _pending.discard(name)
+
+
+def schedule_derivatives(name, on_done=None):
+    """Build thumbnails for ``name`` in the background unless they exist or are on their way."""
+    if thumbnails_ready(name):
+        return
+    with _lock:
+        if name in _pending:
+            return
+        _pending.add(name)
+    _get_executor().submit(_build, name, on_done)
@@ -0,0 +1,136 @@
+# election_project/election_app/imports.py
+import csv
+import io
+import zipfile
+
+from django.db import DataError, IntegrityError, transaction
+
+from .activity import log_activity
+from .hashers import hash_voter_passwords
+from .models import Voter
+from .results import bump_results_version
+
+COLUMNS = ['name', 'sex', 'status', 'major_minor', 'department', 'dept_id', 'password']
+BATCH_SIZE = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # (line, message)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def read_rows(fileobj, filename):
+    """Yield ``(line, row dict)`` from a binary CSV or XLSX file without loading it all.
+
+    A file that can't be parsed raises ValueError, even part-way through.
+    """
+    if filename.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+            from openpyxl.utils.exceptions import InvalidFileException
+        except ImportError:
+            raise ValueError('XLSX import needs openpyxl installed; upload a CSV instead')
+        try:
+            sheet = load_workbook(fileobj, read_only=True, data_only=True).active
+        except (zipfile.BadZipFile, KeyError, InvalidFileException) as exc:
+            raise ValueError(f'not a valid XLSX workbook ({exc})')
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            yield line, {key: '' if value is None else str(value).strip() for key, value in zip(header, values)}
+    else:
+        reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline=''))
+        try:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+            for row in reader:
+                yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key}
+        except csv.Error as exc:
+            raise ValueError(f'line {reader.line_num + 1}: {exc}')
+
+
+def _choices(field):
+    return {value for value, _ in Voter._meta.get_field(field).choices}
+
+
+def validate_row(row):
+    missing = [column for column in COLUMNS if not row.get(column)]
+    if missing:
+        return f'missing {", ".join(missing)}'
+    for field in ('sex', 'status', 'major_minor'):
+        if row[field] not in _choices(field):
+            return f'invalid {field} {row[field]!r}'
+    for field in COLUMNS:
+        max_length = Voter._meta.get_field(field).max_length
+        # The password column holds the hash, not the raw value.
+        if field != 'password' and max_length and len(row[field]) > max_length:
+            return f'{field} is longer than {max_length} characters'
+    return None
+
+
+def _write_batch(batch, report):
+    lines, rows = zip(*batch)
+    taken = set(Voter.objects.filter(dept_id__in=[row['dept_id'] for row in rows]).values_list('dept_id', flat=True))
+    fresh = []
+    for line, row in batch:
+        if row['dept_id'] in taken:
+            report.error(line, f'dept_id {row["dept_id"]} is already registered')
+        else:
+            fresh.append((line, row))
+    if not fresh:
+        return
+    # Hashing is the slow part; PBKDF2 releases the GIL, so the hasher threads share it out.
+    hashes = hash_voter_passwords([row['password'] for _, row in fresh])
+    voters = [
+        Voter(name=row['name'], sex=row['sex'], status=row['status'], major_minor=row['major_minor'],
+              department=row['department'], dept_id=row['dept_id'], password=password)
+        for (_, row), password in zip(fresh, hashes)
+    ]
+    try:
+        with transaction.atomic():
+            Voter.objects.bulk_create(voters, batch_size=BATCH_SIZE)
+    except IntegrityError:
+        for line, row in fresh:
+            report.error(line, f'batch skipped: dept_id conflict while saving (row {row["dept_id"]})')
+        return
+    except DataError as exc:
+        for line, row in fresh:
+            report.error(line, f'batch skipped: the database rejected it ({exc})')
+        return
+    report.created += len(voters)
+
+
+def import_voters(rows, source='upload', progress=None):
+    """Validate every ``(line, row)`` pair, then bulk-create the valid voters in batches.
+
+    Returns an ImportReport; invalid rows are skipped and reported, valid rows
+    are saved. The whole file is read before the first write, so a file that
+    fails to parse part-way imports nothing. ``progress(report)`` is called
+    after every batch.
+    """
+    report = ImportReport()
+    seen = set()
+    valid = []
+    for line, row in rows:
+        report.rows += 1
+        problem = validate_row(row)
+        if problem is None and row['dept_id'] in seen:
+            problem = f'duplicate dept_id {row["dept_id"]} in file'
+        if problem:
+            report.error(line, problem)
+            continue
+        seen.add(row['dept_id'])
+        valid.append((line, row))
+    for start in range(0, len(valid), BATCH_SIZE):
+        _write_batch(valid[start:start + BATCH_SIZE], report)
+        if progress:
+            progress(report)
+    if report.created:
+        # bulk_create sends no post_save, so the roll size in the results snapshot is refreshed here.
+        bump_results_version()
+        log_activity(type='Voters imported', description=f'{report.created} voters imported from {source}', icon='fa-file-import', color='green')
+    return report
@@ -0,0 +1,75 @@
+# election_project/election_app/listing.py
+from django.db.models import Q
+
+from .models import Candidate, Voter
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+VOTER_FILTERS = ('department', 'status', 'major_minor')
+CANDIDATE_FILTERS = ('department', 'position')
+
+
+def _int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def filter_voters(params):
+    voters = Voter.objects.all()
+    q = params.get('q', '').strip()
+    if q:
+        voters = voters.filter(Q(name__icontains=q) | Q(dept_id__istartswith=q))
+    for field in VOTER_FILTERS:
+        if params.get(field):
+            voters = voters.filter(**{field: params[field]})
+    if params.get('has_voted') in ('0', '1'):
+        voters = voters.filter(has_voted=params['has_voted'] == '1')
+    return voters
+
+
+def filter_candidates(params):
+    candidates = Candidate.objects.with_votes()
+    q = params.get('q', '').strip()
+    if q:
+        candidates = candidates.filter(name__icontains=q)
+    for field in CANDIDATE_FILTERS:
+        if params.get(field):
+            candidates = candidates.filter(**{field: params[field]})
+    return candidates
+
+
+def keyset_page(queryset, params):
+    """Return ``(rows, next_cursor, prev_cursor)`` for the page selected by ``after``/``before`` ids.
+
+    Pages are addressed by primary key rather than OFFSET, so fetching page
+    1000 costs the same index range scan as fetching page 1.
+    """
+    size = min(max(_int(params.get('size'), PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    before = _int(params.get('before'))
+    after = _int(params.get('after'))
+    if before is not None:
+        rows = list(queryset.filter(pk__lt=before).order_by('-pk')[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size][::-1]
+        prev_cursor = rows[0].pk if has_more else None
+        next_cursor = rows[-1].pk if rows else None
+    else:
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        rows = list(queryset.order_by('pk')[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size]
+        next_cursor = rows[-1].pk if has_more else None
+        prev_cursor = rows[0].pk if after is not None and rows else None
+    return rows, next_cursor, prev_cursor
+
+
+def page_url(request, **cursor):
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params.update(cursor)
+    return f'{request.path}?{params.urlencode()}'
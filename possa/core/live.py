@@ -0,0 +1,126 @@
+# election_project/election_app/live.py
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+
+from .results import VERSION_KEY, results_snapshot
+from .versions import state_cache
+
+POLL_INTERVAL = 0.5
+KEEPALIVE_INTERVAL = 15
+SUBSCRIBER_BACKLOG = 16
+# A failing poll (cache or database down) is retried with doubling delays up to this.
+MAX_BACKOFF = 30
+
+logger = logging.getLogger(__name__)
+
+
+def results_delta(old, new):
+    """Return the event that moves a client from ``old`` to ``new``, or None if nothing changed."""
+    before = {c['id']: c for c in old['candidates']}
+    if set(before) != {c['id'] for c in new['candidates']}:
+        return 'snapshot', new
+    delta = {'version': new['version']}
+    changed = [c for c in new['candidates'] if before[c['id']] != c]
+    if changed:
+        delta['candidates'] = changed
+    for key in ('year_percent', 'major_percent'):
+        if old[key] != new[key]:
+            delta[key] = new[key]
+    if len(delta) == 1:
+        return None
+    return 'delta', delta
+
+
+class ResultsPublisher:
+    """Watches the results version and fans tally changes out to every subscriber.
+
+    Only the publisher touches the cache and database; subscribers just read
+    their queue. A subscriber that falls SUBSCRIBER_BACKLOG events behind has
+    its backlog dropped and is sent one full snapshot instead. A failed poll is
+    logged and retried with backoff, so subscribers just see no events meanwhile.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.snapshot = None
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event):
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(('snapshot', self.snapshot))
+
+    async def poll(self):
+        version = await state_cache.aget(VERSION_KEY)
+        if self.snapshot is None or version != self.snapshot['version']:
+            snapshot = await sync_to_async(results_snapshot)()
+            event = ('snapshot', snapshot) if self.snapshot is None else results_delta(self.snapshot, snapshot)
+            self.snapshot = snapshot
+            if event:
+                self.publish(event)
+
+    async def run(self):
+        failures = 0
+        while self.subscribers:
+            try:
+                await self.poll()
+            except Exception:
+                failures += 1
+                logger.exception('Results publisher poll failed')
+                await asyncio.sleep(min(POLL_INTERVAL * 2 ** failures, MAX_BACKOFF))
+                continue
+            failures = 0
+            await asyncio.sleep(POLL_INTERVAL)
+        self.snapshot = None
+
+
+_publishers = {}
+
+
+def get_publisher():
+    # One publisher per event loop: a single one per ASGI worker process.
+    loop = asyncio.get_running_loop()
+    if loop not in _publishers:
+        for stale in [l for l in _publishers if l.is_closed()]:
+            del _publishers[stale]
+        _publishers[loop] = ResultsPublisher()
+    return _publishers[loop]
+
+
+def sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def results_stream():
+    publisher = get_publisher()
+    queue = publisher.subscribe()
+    try:
+        # Before its first read the publisher sends every subscriber a snapshot itself.
+        if publisher.snapshot is not None:
+            yield sse('snapshot', publisher.snapshot)
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield sse(event, data)
+    finally:
+        publisher.unsubscribe(queue)
@@ -0,0 +1,41 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.benchmarks import SCENARIOS, scratch_database
+
+
+class Command(BaseCommand):
+    help = 'Run a performance scenario against a scratch database and print the results as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS))
+        parser.add_argument('--voters', type=int, default=2000)
+        parser.add_argument('--candidates', type=int, default=5, help='Candidates per race.')
+        parser.add_argument('--races', type=int, default=1, help='Positions on the ballot.')
+        parser.add_argument('--workers', default='1,4,16',
+                            help='Comma-separated thread counts; the scenario is repeated for each.')
+        parser.add_argument('--pollers', type=int, default=2,
+                            help='Admins polling the results JSON during the workflow scenario.')
+        parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between results polls.')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            options['workers'] = [int(w) for w in options['workers'].split(',')]
+        except ValueError:
+            raise CommandError('--workers must be a comma-separated list of integers')
+        # Seeding thousands of voters with the production hasher would dominate the run;
+        # the other hashers stay registered for scenarios that measure them.
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher', *settings.PASSWORD_HASHERS]
+        with override_settings(PASSWORD_HASHERS=hashers):
+            with scratch_database():
+                report = SCENARIOS[options['scenario']](options)
+        report['scenario'] = options['scenario']
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(text)
+        self.stdout.write(text)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.ballots import bump_candidates_version
+from core.images import build_derivatives, thumbnails_ready
+from core.signals import IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Build missing photo thumbnails, e.g. for uploads made before the image pipeline existed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild thumbnails that already exist.')
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for model, fields in IMAGE_FIELDS.items():
+            for row in model.objects.values_list(*fields).iterator():
+                for name in row:
+                    if not name or (thumbnails_ready(name) and not options['force']):
+                        continue
+                    try:
+                        build_derivatives(name)
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'{name}: {exc}')
+                    else:
+                        built += 1
+        if built:
+            bump_candidates_version()
+        self.stdout.write(f'Built thumbnails for {built} image(s), {failed} failed')
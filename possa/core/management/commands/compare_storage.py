@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Run the votes benchmark once per storage profile (plain SQLite, tuned SQLite and, '
+            'given a URL, PostgreSQL with and without pooling) and compare throughput.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--postgres', default=os.environ.get('DATABASE_URL'),
+                            help='postgres:// URL to include; its user needs to be able to create databases.')
+        parser.add_argument('--pool-size', type=int, default=20)
+        parser.add_argument('--voters', type=int, default=2000)
+        parser.add_argument('--candidates', type=int, default=5)
+        parser.add_argument('--races', type=int, default=1)
+        parser.add_argument('--workers', default='1,4,16')
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+
+    def profiles(self, options):
+        # Settings read the database from the environment at startup, so each profile is its own process.
+        base = {k: v for k, v in os.environ.items() if k not in ('DATABASE_URL', 'DB_POOL_SIZE', 'SQLITE_TUNED')}
+        yield 'sqlite', dict(base, SQLITE_TUNED='0')
+        yield 'sqlite-tuned', dict(base, SQLITE_TUNED='1')
+        if options['postgres']:
+            yield 'postgresql', dict(base, DATABASE_URL=options['postgres'])
+            yield 'postgresql-pool', dict(base, DATABASE_URL=options['postgres'], DB_POOL_SIZE=str(options['pool_size']))
+
+    def handle(self, *args, **options):
+        command = [
+            sys.executable, sys.argv[0], 'benchmark', 'votes',
+            '--voters', str(options['voters']), '--candidates', str(options['candidates']),
+            '--races', str(options['races']), '--workers', options['workers'],
+        ]
+        report = {'voters': options['voters'], 'races': options['races'], 'profiles': {}}
+        for name, env in self.profiles(options):
+            self.stderr.write(f'Running {name}...')
+            done = subprocess.run(command, env=env, capture_output=True, text=True)
+            if done.returncode:
+                raise CommandError(f'{name} failed:\n{done.stderr}')
+            runs = json.loads(done.stdout)['runs']
+            report['profiles'][name] = [
+                {
+                    'workers': run['workers'],
+                    'ballots_per_second': run['ballots_per_second'],
+                    'p95_ms': run['latency'].get('p95_ms'),
+                    'errors': run['errors'],
+                    'lost_updates': run['lost_updates'],
+                }
+                for run in runs
+            ]
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(text)
+        self.stdout.write(text)
@@ -0,0 +1,23 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core.exports import EXPORTS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Stream a dataset (voters, candidates, activity, ballots) to a CSV or NDJSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write; defaults to stdout.')
+
+    def handle(self, *args, **options):
+        out = open(options['output'], 'w', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in export_lines(options['dataset'], options['fmt']):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import import_voters, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk-register voters from a CSV or XLSX roll (columns: name, sex, status, major_minor, department, dept_id, password).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as fh:
+                report = import_voters(read_rows(fh, path), source=path, progress=self.progress)
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+        for line, problem in report.errors:
+            self.stderr.write(f'Row {line}: {problem}')
+        self.stdout.write(self.style.SUCCESS(f'{report.created} of {report.rows} voters imported, {len(report.errors)} rejected'))
+
+    def progress(self, report):
+        self.stdout.write(f'{report.rows} rows read, {report.created} imported, {len(report.errors)} rejected')
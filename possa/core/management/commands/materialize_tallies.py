@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tallies import materialize, recount
+
+
+class Command(BaseCommand):
+    help = 'Fold newly cast ballots into the materialized tallies, once or continuously.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running, folding new ballots every INTERVAL seconds.')
+        parser.add_argument('--recount', action='store_true',
+                            help='Discard the tallies and rebuild them from the whole ballot ledger first.')
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            counted = recount()
+            self.stdout.write(f'Recounted {counted} ballot(s)')
+        while True:
+            folded = materialize()
+            if folded:
+                self.stdout.write(f'Folded {folded} ballot(s)')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
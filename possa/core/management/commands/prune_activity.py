@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.activity import flush_activity, rollup_activity
+
+
+class Command(BaseCommand):
+    help = 'Replay spooled activity entries and roll old ones up into daily counts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ACTIVITY_RETENTION_DAYS,
+                            help='Keep individual entries this many days (default: ACTIVITY_RETENTION_DAYS).')
+
+    def handle(self, *args, **options):
+        replayed = flush_activity()
+        if replayed:
+            self.stdout.write(f'Wrote {replayed} spooled activity entries')
+        rolled = rollup_activity(options['days'])
+        self.stdout.write(f'Rolled up {rolled} activity entries older than {options["days"]} day(s)')
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routing import REPLICA, mark_replica_synced
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary into the SQLite replica file, once or continuously.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep running, syncing every INTERVAL seconds.')
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.settings or connections[REPLICA].vendor != 'sqlite' or connections['default'].vendor != 'sqlite':
+            raise CommandError('sync_replica needs SQLite for both the primary and the replica (set SQLITE_REPLICA).')
+        source = str(connections['default'].settings_dict['NAME'])
+        target = str(connections[REPLICA].settings_dict['NAME'])
+        while True:
+            # Taken before the copy starts, so the replica is at least this current.
+            synced_at = time.time_ns()
+            tmp = f'{target}.{os.getpid()}.tmp'
+            src = sqlite3.connect(source)
+            dst = sqlite3.connect(tmp)
+            try:
+                src.backup(dst)
+                # Rollback journal on the copy: a WAL file left by readers of the
+                # replaced copy must never be paired with the new one.
+                dst.execute('PRAGMA journal_mode=DELETE')
+            finally:
+                dst.close()
+                src.close()
+            # New connections open the fresh copy; open ones finish on the old file.
+            os.replace(tmp, target)
+            mark_replica_synced(synced_at)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
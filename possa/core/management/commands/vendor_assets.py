@@ -0,0 +1,47 @@
+import os
+import posixpath
+import re
+import urllib.request
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.assets import VENDOR_ASSETS
+
+CSS_URL = re.compile(r'url\(\s*["\']?(?!data:|https?:|//)([^"\')?#]+)')
+
+
+class Command(BaseCommand):
+    help = ('Download the pinned CSS/JS the templates use into static/vendor/, with the fonts '
+            'their stylesheets reference. Run collectstatic afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Download assets that already exist.')
+
+    def handle(self, *args, **options):
+        root = settings.STATICFILES_DIRS[0]
+        fetched = 0
+        for name, (path, url) in VENDOR_ASSETS.items():
+            queue = [(path, url)]
+            while queue:
+                path, url = queue.pop()
+                target = os.path.join(root, *path.split('/'))
+                if os.path.exists(target) and not options['force']:
+                    continue
+                try:
+                    with urllib.request.urlopen(url, timeout=30) as response:
+                        data = response.read()
+                except OSError as exc:
+                    raise CommandError(f'{name}: could not download {url}: {exc}')
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'wb') as fh:
+                    fh.write(data)
+                fetched += 1
+                if path.endswith('.css'):
+                    # collectstatic rewrites url() references to hashed names and
+                    # fails on any that are missing, so bring the fonts along.
+                    for ref in set(CSS_URL.findall(data.decode('utf-8', 'replace'))):
+                        queue.append((posixpath.normpath(posixpath.join(posixpath.dirname(path), ref)),
+                                      urljoin(url, ref)))
+        self.stdout.write(f'Downloaded {fetched} file(s) into {root}')
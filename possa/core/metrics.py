@@ -0,0 +1,266 @@
+# election_project/election_app/metrics.py
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+METRICS = {
+    'election_request_duration_seconds': ('histogram', 'Time spent handling a request, by view.'),
+    'election_request_queries': ('histogram', 'SQL queries run while handling a request, by view.'),
+    'election_request_sql_seconds': ('histogram', 'Time spent in SQL while handling a request, by view.'),
+    'election_responses_total': ('counter', 'Responses sent, by view and status code.'),
+    'election_template_render_seconds': ('histogram', 'Time spent rendering a template, by template.'),
+    'election_cache_requests_total': ('counter', 'Cache lookups, by cache alias and hit or miss.'),
+}
+
+_request = contextvars.ContextVar('metrics_request', default=None)
+_MISSING = object()
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Process-local metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = defaultdict(float)
+
+    def observe(self, name, labels, value, buckets=SECONDS_BUCKETS):
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[name, labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[name, labels] += value
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self):
+        with self.lock:
+            series = defaultdict(list)
+            for (name, labels), histogram in self.histograms.items():
+                series[name].append((labels, (histogram.buckets, list(histogram.counts), histogram.sum)))
+            for (name, labels), value in self.counters.items():
+                series[name].append((labels, value))
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            if name not in series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in sorted(series[name], key=lambda item: item[0]):
+                if kind == 'counter':
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                buckets, counts, total = value
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+REGISTRY = Registry()
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'sql_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+class MetricsMiddleware:
+    """Time each request and count the SQL it runs, labelled by URL name.
+
+    Queries are counted by a wrapper every connection gets (see ``install``),
+    so this works with DEBUG off. Queries a streaming response runs after
+    the view returns are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _request.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        record_request(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _request.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        record_request(request, response, stats)
+        return response
+
+
+def record_request(request, response, stats):
+    match = request.resolver_match
+    view = (('view', match.view_name if match else 'unresolved'),)
+    REGISTRY.observe('election_request_duration_seconds', view, time.perf_counter() - stats.started)
+    REGISTRY.observe('election_request_queries', view, stats.queries, QUERY_BUCKETS)
+    REGISTRY.observe('election_request_sql_seconds', view, stats.sql_seconds)
+    REGISTRY.inc('election_responses_total', view + (('status', response.status_code),))
+
+
+def count_query(execute, sql, params, many, context):
+    stats = _request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+
+def _add_query_counter(sender, connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def _instrument_templates():
+    from django.template.backends.django import Template
+
+    render = Template.render
+
+    @functools.wraps(render)
+    def timed_render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            name = self.origin.template_name or 'string'
+            REGISTRY.observe('election_template_render_seconds', (('template', name),), time.perf_counter() - started)
+
+    Template.render = timed_render
+
+
+def _instrument_cache(cache, alias):
+    get, get_many = cache.get, cache.get_many
+    hit = (('cache', alias), ('result', 'hit'))
+    miss = (('cache', alias), ('result', 'miss'))
+
+    @functools.wraps(get)
+    def counted_get(key, default=None, version=None):
+        value = get(key, _MISSING, version)
+        if value is _MISSING:
+            REGISTRY.inc('election_cache_requests_total', miss)
+            return default
+        REGISTRY.inc('election_cache_requests_total', hit)
+        return value
+
+    @functools.wraps(get_many)
+    def counted_get_many(keys, version=None):
+        keys = list(keys)
+        found = get_many(keys, version)
+        REGISTRY.inc('election_cache_requests_total', hit, len(found))
+        REGISTRY.inc('election_cache_requests_total', miss, len(keys) - len(found))
+        return found
+
+    # Async lookups in BaseCache fall through to these, as does BaseCache.get_many.
+    cache.get = counted_get
+    if type(cache).get_many is not BaseCache.get_many:
+        cache.get_many = counted_get_many
+    return cache
+
+
+def _instrument_caches():
+    # Cache instances are created per thread and alias, and several aliases
+    # can share a backend class, so each instance is wrapped as it is created.
+    create_connection = caches.create_connection
+
+    @functools.wraps(create_connection)
+    def instrumented(alias):
+        return _instrument_cache(create_connection(alias), alias)
+
+    caches.create_connection = instrumented
+    for alias in caches:
+        if hasattr(caches._connections, alias):
+            _instrument_cache(caches[alias], alias)
+
+
+_installed = False
+
+
+def install():
+    """Hook query counting, template timing and cache hit counting in; called from CoreConfig.ready.
+
+    Django has no production hooks for template rendering or cache lookups,
+    so templates are wrapped at the class level, the way its test runner
+    instruments template rendering, and caches per alias as they are created.
+    """
+    global _installed
+    if _installed or not settings.METRICS_ENABLED:
+        return
+    _installed = True
+    connection_created.connect(_add_query_counter)
+    _instrument_templates()
+    _instrument_caches()
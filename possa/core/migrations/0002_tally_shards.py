@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_votes_to_shards(apps, schema_editor):
+    Candidate = apps.get_model('core', 'Candidate')
+    TallyShard = apps.get_model('core', 'TallyShard')
+    TallyShard.objects.bulk_create(
+        TallyShard(candidate_id=pk, shard=0, votes=votes)
+        for pk, votes in Candidate.objects.filter(votes__gt=0).values_list('pk', 'votes')
+    )
+
+
+def move_votes_to_candidates(apps, schema_editor):
+    Candidate = apps.get_model('core', 'Candidate')
+    TallyShard = apps.get_model('core', 'TallyShard')
+    totals = TallyShard.objects.values('candidate').annotate(total=models.Sum('votes'))
+    for row in totals:
+        Candidate.objects.filter(pk=row['candidate']).update(votes=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TallyShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('votes', models.IntegerField(default=0)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tally_shards', to='core.candidate')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('candidate', 'shard'), name='unique_tally_shard')],
+            },
+        ),
+        migrations.RunPython(move_votes_to_shards, move_votes_to_candidates),
+        migrations.RemoveField(
+            model_name='candidate',
+            name='votes',
+        ),
+    ]
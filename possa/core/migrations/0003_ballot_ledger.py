@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def shards_to_ballots(apps, schema_editor):
+    # Votes counted before the ledger existed become voter-less ballots so a
+    # recount from the ledger reproduces them; the materializer folds them in.
+    Candidate = apps.get_model('core', 'Candidate')
+    Ballot = apps.get_model('core', 'Ballot')
+    totals = Candidate.objects.annotate(total=models.Sum('tally_shards__votes')).filter(total__gt=0)
+    for candidate in totals:
+        Ballot.objects.bulk_create(
+            [Ballot(candidate=candidate, position=candidate.position) for _ in range(candidate.total)],
+            batch_size=1000,
+        )
+
+
+def ballots_to_shards(apps, schema_editor):
+    Ballot = apps.get_model('core', 'Ballot')
+    TallyShard = apps.get_model('core', 'TallyShard')
+    TallyShard.objects.bulk_create(
+        TallyShard(candidate_id=row['candidate'], shard=0, votes=row['total'])
+        for row in Ballot.objects.values('candidate').annotate(total=models.Count('id')).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tally_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TallyCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('high_water', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ballot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.CharField(max_length=100)),
+                ('cast_at', models.DateTimeField(auto_now_add=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ballots', to='core.candidate')),
+                ('voter', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.voter')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.CharField(max_length=100)),
+                ('votes', models.IntegerField(default=0)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='core.candidate')),
+            ],
+        ),
+        migrations.RunPython(shards_to_ballots, ballots_to_shards),
+        migrations.DeleteModel(
+            name='TallyShard',
+        ),
+        migrations.AddConstraint(
+            model_name='tally',
+            constraint=models.UniqueConstraint(fields=('candidate', 'position'), name='unique_tally'),
+        ),
+    ]
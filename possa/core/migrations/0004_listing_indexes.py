@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ballot_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['department'], name='candidate_department_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['position'], name='candidate_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['department'], name='voter_department_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['status'], name='voter_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['major_minor'], name='voter_major_minor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['has_voted'], name='voter_has_voted_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(condition=models.Q(('has_voted', True)), fields=['status', 'major_minor'], name='voter_turnout_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_turnout_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='candidate',
+            name='status',
+        ),
+        migrations.RemoveField(
+            model_name='candidate',
+            name='status_color',
+        ),
+    ]
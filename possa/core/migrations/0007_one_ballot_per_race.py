@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_drop_candidate_status'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='ballot',
+            constraint=models.UniqueConstraint(fields=('voter', 'position'), name='one_ballot_per_race'),
+        ),
+    ]
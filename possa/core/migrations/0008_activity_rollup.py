@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_one_ballot_per_race'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='activitylog',
+            name='time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['time'], name='activity_time_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='activityrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'type'), name='unique_activity_rollup'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+def mark_folded(apps, schema_editor):
+    # Ballots at or below the old high-water mark are already in Tally.
+    TallyCheckpoint = apps.get_model('core', 'TallyCheckpoint')
+    Ballot = apps.get_model('core', 'Ballot')
+    checkpoint = TallyCheckpoint.objects.filter(pk=1).first()
+    if checkpoint:
+        Ballot.objects.filter(id__lte=checkpoint.high_water).update(folded=True)
+
+
+def restore_checkpoint(apps, schema_editor):
+    # Only exact if the folded ballots are a prefix of the ledger, as they
+    # are until a fold skips an uncommitted ballot.
+    TallyCheckpoint = apps.get_model('core', 'TallyCheckpoint')
+    Ballot = apps.get_model('core', 'Ballot')
+    unfolded = Ballot.objects.filter(folded=False).aggregate(first=models.Min('id'))['first']
+    high_water = (unfolded - 1) if unfolded else (Ballot.objects.aggregate(last=models.Max('id'))['last'] or 0)
+    TallyCheckpoint.objects.update_or_create(pk=1, defaults={'high_water': high_water})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_activity_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ballot',
+            name='folded',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_folded, restore_checkpoint),
+        migrations.DeleteModel(
+            name='TallyCheckpoint',
+        ),
+        migrations.AddIndex(
+            model_name='ballot',
+            index=models.Index(condition=models.Q(('folded', False)), fields=['candidate'], name='ballot_unfolded_idx'),
+        ),
+    ]
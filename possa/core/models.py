@@ -1,7 +1,11 @@
 # election_project/election_app/models.py
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.auth.hashers import check_password
+from .hashers import hash_voter_password
+from .images import image_variants
 
 class ElectionSetting(models.Model):
     start_date = models.DateTimeField(default=timezone.now)
@@ -10,15 +14,48 @@ class ElectionSetting(models.Model):
     admin_role = models.CharField(max_length=100, default='Administrator')
     admin_avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
 
+    @property
+    def admin_avatar_variants(self):
+        return image_variants(self.admin_avatar)
+
+    @classmethod
+    def load(cls):
+        # There is only ever one row; create it with defaults on first use.
+        return cls.objects.order_by('pk').first() or cls.objects.create()
+
+class CandidateQuerySet(models.QuerySet):
+    def with_votes(self):
+        # Materialized Tally rows (see core.tallies) plus ballots not folded
+        # yet, in one statement so the two can't drift apart, and exact on a
+        # replica that can't run the fold itself.
+        pending = (
+            Ballot.objects.filter(candidate=OuterRef('pk'), folded=False)
+            .order_by().values('candidate').annotate(count=Count('pk')).values('count')
+        )
+        return self.annotate(votes=Coalesce(Sum('tallies__votes'), 0) + Coalesce(Subquery(pending), 0))
+
 class Candidate(models.Model):
     name = models.CharField(max_length=100)
     department = models.CharField(max_length=100)
     position = models.CharField(max_length=100)
-    votes = models.IntegerField(default=0)
     photo = models.ImageField(upload_to='candidates/', null=True, blank=True)
     party_photo = models.ImageField(upload_to='parties/', null=True, blank=True)
-    status = models.CharField(max_length=20, default='Running')
-    status_color = models.CharField(max_length=20, default='blue')
+
+    objects = CandidateQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['department'], name='candidate_department_idx'),
+            models.Index(fields=['position'], name='candidate_position_idx'),
+        ]
+
+    @property
+    def photo_variants(self):
+        return image_variants(self.photo)
+
+    @property
+    def party_photo_variants(self):
+        return image_variants(self.party_photo)
 
 class Voter(models.Model):
     name = models.CharField(max_length=100)
@@ -31,16 +68,76 @@ class Voter(models.Model):
     photo = models.ImageField(upload_to='voters/', null=True, blank=True)
     has_voted = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['department'], name='voter_department_idx'),
+            models.Index(fields=['status'], name='voter_status_idx'),
+            models.Index(fields=['major_minor'], name='voter_major_minor_idx'),
+            models.Index(fields=['has_voted'], name='voter_has_voted_idx'),
+            # Covers the turnout breakdown: only voters who voted, only the grouped columns.
+            models.Index(fields=['status', 'major_minor'], condition=models.Q(has_voted=True), name='voter_turnout_idx'),
+        ]
+
     def set_password(self, raw_password):
-        self.password = make_password(raw_password)
+        self.password = hash_voter_password(raw_password)
         self.save()
 
     def check_password(self, raw_password):
         return check_password(raw_password, self.password)
 
+    @property
+    def photo_variants(self):
+        return image_variants(self.photo)
+
 class ActivityLog(models.Model):
     type = models.CharField(max_length=50)
     description = models.TextField()
-    time = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens; entries are written later, in batches (see core.activity).
+    time = models.DateTimeField(default=timezone.now)
     icon = models.CharField(max_length=50, default='fa-info')
-    color = models.CharField(max_length=20, default='blue')
\ No newline at end of file
+    color = models.CharField(max_length=20, default='blue')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['time'], name='activity_time_idx'),
+        ]
+
+class ActivityRollup(models.Model):
+    # Daily per-type counts of activity entries past their retention period.
+    day = models.DateField()
+    type = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'type'], name='unique_activity_rollup'),
+        ]
+
+class Ballot(models.Model):
+    # Append-only ledger of cast votes; ``folded`` is set in the same
+    # transaction that adds the ballot to its Tally row. Ballots outlive voter
+    # records, and votes carried over from before the ledger existed have no voter.
+    voter = models.ForeignKey(Voter, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+')
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='ballots')
+    position = models.CharField(max_length=100)
+    cast_at = models.DateTimeField(auto_now_add=True)
+    folded = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['voter', 'position'], name='one_ballot_per_race'),
+        ]
+        indexes = [
+            models.Index(fields=['candidate'], condition=models.Q(folded=False), name='ballot_unfolded_idx'),
+        ]
+
+class Tally(models.Model):
+    # Per-candidate, per-position vote counts materialized from Ballot rows.
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='tallies')
+    position = models.CharField(max_length=100)
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['candidate', 'position'], name='unique_tally'),
+        ]
@@ -0,0 +1,156 @@
+# election_project/election_app/reports.py
+import datetime
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+
+# Builders only see the snapshot dict; they never touch the ORM.
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def report_tables(snapshot):
+    return [
+        ('Candidates Results', ['Name', 'Votes'],
+         [[c['name'], str(c['votes'])] for c in snapshot['candidates']]),
+        ('Votes by Year Level (%)', ['Year Level', 'Percentage'],
+         [[key, f'{value}%'] for key, value in snapshot['year_percent'].items()]),
+        ('Votes by Major/Minor (%)', ['Type', 'Percentage'],
+         [[key, f'{value}%'] for key, value in snapshot['major_percent'].items()]),
+    ]
+
+
+def build_pdf(snapshot):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph('Election Results Report', styles['Title']),
+        Paragraph(f'Generated on: {datetime.date.today()}', styles['Normal']),
+        Paragraph('', styles['Normal']),  # Spacer
+    ]
+    for title, header, rows in report_tables(snapshot):
+        story.append(Paragraph(title, styles['Heading2']))
+        table = Table([header] + rows)
+        table.setStyle(TABLE_STYLE)
+        story.append(table)
+        story.append(Paragraph('', styles['Normal']))  # Spacer
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def build_docx(snapshot):
+    doc = Document()
+    doc.add_heading('Election Results Report', level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_paragraph(f'Generated on: {datetime.date.today()}')
+    for title, header, rows in report_tables(snapshot):
+        doc.add_heading(title, level=2)
+        table = doc.add_table(rows=1, cols=len(header))
+        table.style = 'Table Grid'
+        for cell, text in zip(table.rows[0].cells, header):
+            cell.text = text
+        for row in rows:
+            for cell, text in zip(table.add_row().cells, row):
+                cell.text = text
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+REPORTS = {
+    'pdf': (build_pdf, 'pdf', 'election_results.pdf'),
+    'word': (build_docx, 'docx', 'election_results.docx'),
+}
+
+
+def _report_version(path):
+    try:
+        return int(path.stem.removeprefix('results-'))
+    except ValueError:
+        return None
+
+
+def write_report(kind, snapshot, path):
+    """Render one report to ``path`` atomically and remove older versions of it."""
+    build, extension, _ = REPORTS[kind]
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(build(snapshot))
+        os.replace(tmp, path)
+    finally:
+        # Only left behind if the build or the write failed.
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    # Only versions older than this one go: another worker may have just
+    # written a newer one. Open downloads of an old version keep reading
+    # their unlinked file.
+    for old in Path(directory).glob(f'results-*.{extension}'):
+        version = _report_version(old)
+        if version is not None and version < snapshot['version']:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def report_path(kind, version):
+    return Path(settings.REPORTS_DIR) / f'results-{version}.{REPORTS[kind][1]}'
+
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.REPORT_WORKERS, thread_name_prefix='reports')
+    return _executor
+
+
+def render_report(kind, snapshot):
+    """Schedule a render of ``kind`` for the snapshot's version; concurrent callers share one render."""
+    key = (kind, snapshot['version'])
+    with _lock:
+        future = _pending.get(key)
+        if future is None:
+            future = _get_executor().submit(write_report, kind, snapshot, str(report_path(*key)))
+            _pending[key] = future
+            future.add_done_callback(lambda f: _pending.pop(key, None))
+    return future
+
+
+def open_report(kind, snapshot):
+    """Open the report for the snapshot's version, waiting for a render if there isn't one yet.
+
+    A newer version's render can remove the file at any point before it is
+    opened, so a missing file is rendered again rather than checked for first.
+    """
+    path = report_path(kind, snapshot['version'])
+    for _ in range(3):
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            render_report(kind, snapshot).result()
+    return open(path, 'rb')
@@ -0,0 +1,152 @@
+# election_project/election_app/results.py
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .ballots import ballot_races, candidates_version
+from .models import Candidate, Voter
+from .routing import read_replica
+from .standings import rank_candidates
+from .versions import acurrent_version, bump_version, current_version, state_cache, version_key
+
+VERSION_KEY = version_key('results')
+SNAPSHOT_KEY = 'results:snapshot'
+REBUILD_KEY = 'results:rebuilding'
+INDEX_KEY = 'results:index'
+SNAPSHOT_TIMEOUT = 60 * 60
+# A rebuild that crashes without releasing the lock holds it this long at most.
+REBUILD_TIMEOUT = 30
+
+
+def results_version():
+    return current_version('results')
+
+
+def bump_results_version():
+    return bump_version('results')
+
+
+# Validators come from the snapshot actually served, which may be the
+# previous one while another process rebuilds (see results_snapshot).
+
+def results_etag(request, *args, **kwargs):
+    # Anonymous requests get no validators so they never see a 304.
+    if not request.user.is_authenticated:
+        return None
+    return str(results_snapshot()['version'])
+
+
+def results_last_modified(request, *args, **kwargs):
+    # Second resolution only; the ETag is what distinguishes versions within a second.
+    if not request.user.is_authenticated:
+        return None
+    return datetime.datetime.fromtimestamp(results_snapshot()['version'] / 1e9, tz=datetime.timezone.utc)
+
+
+def results_snapshot():
+    """Return the aggregates every results page needs, computed once per version.
+
+    Rebuilds are single-flight: while one process computes the new version,
+    every other caller keeps getting the previous snapshot instead of
+    running the same queries. Only a cold cache makes callers compute in
+    parallel.
+    """
+    # Read the version before the data: a vote landing mid-computation bumps
+    # past it, so a snapshot can be fresher than its key but never staler.
+    # One entry, overwritten per version, so votes don't fill the cache.
+    version = results_version()
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is not None and snapshot['version'] >= version:
+        return snapshot
+    locked = state_cache.add(REBUILD_KEY, version, REBUILD_TIMEOUT)
+    if snapshot is not None and not locked:
+        return snapshot
+    try:
+        snapshot = compute_snapshot(version)
+        cache.set(SNAPSHOT_KEY, snapshot, SNAPSHOT_TIMEOUT)
+    finally:
+        if locked:
+            state_cache.delete(REBUILD_KEY)
+    return snapshot
+
+
+async def aresults_snapshot():
+    """``results_snapshot()`` for async views; only a cache miss leaves the event loop."""
+    version = await acurrent_version('results')
+    snapshot = await cache.aget(SNAPSHOT_KEY)
+    if snapshot is None or snapshot['version'] < version:
+        snapshot = await sync_to_async(results_snapshot)()
+    return snapshot
+
+
+def turnout():
+    """Return ``(total, counts by status, counts by major_minor)`` for voters who voted.
+
+    One conditional aggregate over the partial voter_turnout_idx index rather
+    than a GROUP BY per breakdown plus a count.
+    """
+    statuses = [value for value, _ in Voter._meta.get_field('status').choices]
+    majors = [value for value, _ in Voter._meta.get_field('major_minor').choices]
+    aggregates = {'total': Count('pk')}
+    aggregates.update({f'status_{value}': Count('pk', filter=Q(status=value)) for value in statuses})
+    aggregates.update({f'major_{value}': Count('pk', filter=Q(major_minor=value)) for value in majors})
+    row = Voter.objects.filter(has_voted=True).aggregate(**aggregates)
+    return (
+        row['total'],
+        {value: row[f'status_{value}'] for value in statuses},
+        {value: row[f'major_{value}'] for value in majors},
+    )
+
+
+def compute_snapshot(version):
+    # Read-only: with_votes() adds the ballots not yet folded into Tally, so
+    # the counts are exact without folding here, on the primary or a replica.
+    with read_replica(as_of=version):
+        candidates = list(Candidate.objects.with_votes().order_by('pk').values('id', 'name', 'position', 'votes'))
+        total_voted, year_counts, major_counts = turnout()
+        total_voters = Voter.objects.count()
+    rank_candidates(candidates)
+    year_percent = {key: round(count / total_voted * 100, 1) for key, count in year_counts.items() if count}
+    major_percent = {key: round(count / total_voted * 100, 1) for key, count in major_counts.items() if count}
+    return {
+        'version': version,
+        'candidates': candidates,
+        'year_percent': year_percent,
+        'major_percent': major_percent,
+        'total_voted': total_voted,
+        'total_voters': total_voters,
+    }
+
+
+async def aindex_candidates():
+    snapshot = await aresults_snapshot()
+    versions = (snapshot['version'], await acurrent_version('candidates'))
+    entry = await cache.aget(INDEX_KEY)
+    if entry is None or entry[0] != versions:
+        return await sync_to_async(index_candidates)()
+    return entry[1]
+
+
+def index_candidates():
+    """Candidate cards for the public index page, with each one's share of all votes.
+
+    Built from the cached snapshot and ballot, once per pair of versions, so
+    re-rendering the page after a failed login doesn't touch the database.
+    """
+    snapshot = results_snapshot()
+    versions = (snapshot['version'], candidates_version())
+    entry = cache.get(INDEX_KEY)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+    votes = {c['id']: c['votes'] for c in snapshot['candidates']}
+    total_votes = sum(votes.values())
+    cards = []
+    for _, candidates in ballot_races():
+        for candidate in candidates:
+            share = votes.get(candidate['id'], 0) / total_votes * 100 if total_votes > 0 else 0
+            cards.append({**candidate, 'percentage': round(share, 2)})
+    cards.sort(key=lambda c: c['id'])
+    cache.set(INDEX_KEY, (versions, cards), SNAPSHOT_TIMEOUT)
+    return cards
@@ -0,0 +1,93 @@
+# election_project/election_app/routing.py
+import contextlib
+import contextvars
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .versions import state_cache
+
+REPLICA = 'replica'
+SYNCED_KEY = 'replica:synced-at'
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+_pg_synced = (0.0, None)  # (checked at, synced at) memo for PostgreSQL replicas
+
+
+class ReplicaRouter:
+    """Send reads inside ``read_replica()`` to the replica; everything else uses the primary.
+
+    Routing is opt-in per block rather than per model: the vote path and
+    admin edits read the same models as the results pages and must see
+    their own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary (replication or sync_replica).
+        return db == 'default'
+
+
+def replica_synced_at():
+    """Nanosecond timestamp the replica is known to be current as of, or None without a replica."""
+    global _pg_synced
+    if REPLICA not in settings.DATABASES:
+        return None
+    if replica_vendor() == 'sqlite':
+        return state_cache.get(SYNCED_KEY)
+    checked, synced = _pg_synced
+    if time.monotonic() - checked > 1:
+        with connections[REPLICA].cursor() as cursor:
+            # The commit time of the last replayed transaction. Having replayed
+            # everything received says nothing about what the primary has
+            # committed since, so that is not treated as "current".
+            cursor.execute('SELECT EXTRACT(EPOCH FROM pg_last_xact_replay_timestamp())')
+            epoch = cursor.fetchone()[0]
+        synced = int(epoch * 1e9) if epoch is not None else None
+        _pg_synced = (time.monotonic(), synced)
+    return synced
+
+
+def replica_vendor():
+    return connections[REPLICA].vendor
+
+
+def mark_replica_synced(synced_at):
+    state_cache.set(SYNCED_KEY, synced_at, None)
+
+
+def replica_alias(as_of=None):
+    """Pick the alias for a read: the replica if it is fresh enough, else ``'default'``.
+
+    With ``as_of`` (a version timestamp in ns) the replica must already
+    include everything up to it; without, it may be up to
+    ``REPLICA_MAX_LAG`` seconds behind.
+
+    Only a ``sync_replica`` copy records exactly what it holds, so only it
+    serves ``as_of`` reads; a PostgreSQL standby serves the lag-tolerant ones.
+    """
+    synced_at = replica_synced_at()
+    if synced_at is None:
+        return 'default'
+    if as_of is not None:
+        return REPLICA if replica_vendor() == 'sqlite' and synced_at >= as_of else 'default'
+    return REPLICA if time.time_ns() - synced_at <= settings.REPLICA_MAX_LAG * 1e9 else 'default'
+
+
+@contextlib.contextmanager
+def read_replica(as_of=None):
+    """Route ORM reads in the block per ``replica_alias(as_of)``."""
+    token = _read_alias.set(replica_alias(as_of))
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
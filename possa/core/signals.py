@@ -0,0 +1,53 @@
+# election_project/election_app/signals.py
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .auth import ADMIN_EXISTS_KEY
+from .ballots import bump_candidates_version
+from .election import bump_settings_version
+from .images import schedule_derivatives
+from .models import Candidate, ElectionSetting, Voter
+from .results import bump_results_version
+from .versions import state_cache
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+@receiver([post_save, post_delete], sender=Voter)
+def invalidate_results(sender, **kwargs):
+    transaction.on_commit(bump_results_version)
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def invalidate_ballot(sender, **kwargs):
+    transaction.on_commit(bump_candidates_version)
+
+
+@receiver([post_save, post_delete], sender=ElectionSetting)
+def invalidate_settings(sender, **kwargs):
+    transaction.on_commit(bump_settings_version)
+
+
+IMAGE_FIELDS = {
+    Candidate: ('photo', 'party_photo'),
+    Voter: ('photo',),
+    ElectionSetting: ('admin_avatar',),
+}
+
+
+@receiver(post_save)
+def build_thumbnails(sender, instance, **kwargs):
+    if sender not in IMAGE_FIELDS:
+        return
+    # The cached ballot and sidebar embed thumbnail URLs, so rebuild them once they exist.
+    on_done = {Candidate: bump_candidates_version, ElectionSetting: bump_settings_version}.get(sender)
+    for field in IMAGE_FIELDS[sender]:
+        name = getattr(instance, field).name
+        if name:
+            transaction.on_commit(lambda name=name: schedule_derivatives(name, on_done))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_admin_exists(sender, **kwargs):
+    state_cache.delete(ADMIN_EXISTS_KEY)
@@ -0,0 +1,38 @@
+# election_project/election_app/standings.py
+from collections import defaultdict
+
+RUNNING = ('Running', 'blue')
+
+
+def rank_candidates(candidates):
+    """Rank candidate dicts within their position, adding ``rank``, ``status`` and ``status_color``.
+
+    Ranks use competition ranking (1, 1, 3). A sole first place with votes is
+    Leading, a shared one is Tied, and everyone else is Running.
+    """
+    races = defaultdict(list)
+    for candidate in candidates:
+        races[candidate['position']].append(candidate)
+    for race in races.values():
+        race.sort(key=lambda c: c['votes'], reverse=True)
+        leaders = sum(1 for c in race if c['votes'] == race[0]['votes'])
+        for i, candidate in enumerate(race):
+            if i == 0 or candidate['votes'] != race[i - 1]['votes']:
+                rank = i + 1
+            candidate['rank'] = rank
+            if rank > 1 or candidate['votes'] == 0:
+                candidate['status'], candidate['status_color'] = RUNNING
+            elif leaders > 1:
+                candidate['status'], candidate['status_color'] = 'Tied', 'yellow'
+            else:
+                candidate['status'], candidate['status_color'] = 'Leading', 'green'
+    return candidates
+
+
+def apply_standings(candidates, snapshot):
+    """Copy status and status_color from the snapshot onto Candidate instances."""
+    standings = {c['id']: c for c in snapshot['candidates']}
+    for candidate in candidates:
+        standing = standings.get(candidate.id)
+        candidate.status, candidate.status_color = (standing['status'], standing['status_color']) if standing else RUNNING
+    return candidates
@@ -0,0 +1,33 @@
+# election_project/election_app/storage.py
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.ttf', '.eot')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hashed static files, plus a ``.gz`` copy of each text file for StaticFileView to send."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in paths:
+            if name.endswith(COMPRESSIBLE):
+                self.compress(name)
+                hashed = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+                if hashed:
+                    self.compress(hashed)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data) * 0.95:
+            with open(path + '.gz', 'wb') as fh:
+                fh.write(compressed)
+        elif os.path.exists(path + '.gz'):
+            os.remove(path + '.gz')
@@ -0,0 +1,105 @@
+# election_project/election_app/tallies.py
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F
+
+from .models import Ballot, Tally
+
+logger = logging.getLogger(__name__)
+
+FOLD_BATCH = 5000
+
+
+def _ballot_counts(queryset):
+    return queryset.values('candidate', 'position').annotate(count=Count('id')).order_by()
+
+
+def _fold_batch():
+    ids = list(Ballot.objects.filter(folded=False).order_by('id').values_list('id', flat=True)[:FOLD_BATCH])
+    if not ids:
+        return 0
+    with transaction.atomic():
+        # Claim the batch with the first statement: it waits for a concurrent
+        # fold holding any of these rows and then finds them already folded,
+        # and on SQLite it takes the write lock before anything is read.
+        # Ballots still being inserted aren't visible yet and wait for a later
+        # pass, so nothing depends on the order ids commit in.
+        if Ballot.objects.filter(id__in=ids, folded=False).update(folded=True) != len(ids):
+            transaction.set_rollback(True)
+            return 0
+        for row in _ballot_counts(Ballot.objects.filter(id__in=ids)):
+            if not Tally.objects.filter(candidate_id=row['candidate'], position=row['position']).update(votes=F('votes') + row['count']):
+                Tally.objects.create(candidate_id=row['candidate'], position=row['position'], votes=row['count'])
+    return len(ids)
+
+
+def materialize():
+    """Fold unfolded ballots into Tally rows; return the number folded.
+
+    Only new ballots are scanned (a partial index covers them), and each
+    batch marks its ballots folded in the transaction that counts them, so
+    a ballot is either in its Tally row or pending, never both or neither.
+    """
+    folded = 0
+    while True:
+        count = _fold_batch()
+        folded += count
+        if count < FOLD_BATCH:
+            return folded
+
+
+class TallyFolder:
+    """Runs ``materialize()`` on a background thread once ballots have committed.
+
+    ``cast_ballot`` calls ``schedule()`` after each commit; the thread waits
+    ``TALLY_FOLD_SECONDS`` so one fold covers every ballot cast meanwhile,
+    then folds whatever is pending, from any process. Requests never fold:
+    reads go through ``with_votes()``, which counts what is still pending.
+    ``manage.py materialize_tallies --interval N`` does the same job from a
+    separate process.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def schedule(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='tally-folder', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(settings.TALLY_FOLD_SECONDS)
+            self._wake.clear()
+            try:
+                materialize()
+            except Exception:
+                logger.exception('Tally fold failed')
+            finally:
+                close_old_connections()
+
+
+tally_folder = TallyFolder()
+# A forked worker starts with no folder thread of its own.
+os.register_at_fork(after_in_child=tally_folder._reset)
+
+
+def recount():
+    """Rebuild every Tally row from the full ballot ledger; return the number of ballots counted."""
+    with transaction.atomic():
+        Ballot.objects.filter(folded=True).update(folded=False)
+        Tally.objects.all().delete()
+    return materialize()
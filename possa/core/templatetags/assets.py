@@ -0,0 +1,10 @@
+from django import template
+
+from core.assets import asset_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_asset(name):
+    return asset_url(name)
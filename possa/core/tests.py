@@ -1,3 +1,1067 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection
+from django.db.models import Count
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import urls as core_urls
+from .activity import ActivityQueue, log_activity, rollup_activity
+from .auth import LoginThrottled, VoterBackend
+from .avatars import avatar_svg
+from .ballots import InvalidBallot, ballot_races
+from .benchmarks import SCENARIOS
+from .election import aelection_open, aelection_settings, bump_settings_version, election_open, election_settings
+from .images import THUMB_SIZES, build_derivatives, derivative_name, schedule_derivatives, thumbnails_ready
+from .imports import COLUMNS, import_voters, validate_row
+from .listing import PAGE_SIZE, filter_voters, keyset_page
+from .live import SUBSCRIBER_BACKLOG, ResultsPublisher, get_publisher, results_stream, sse
+from .models import ActivityLog, ActivityRollup, Ballot, Candidate, ElectionSetting, Tally, Voter
+from .reports import open_report, render_report, report_path, write_report
+from .results import REBUILD_KEY, bump_results_version, results_snapshot
+from .routing import REPLICA, replica_alias
+from .standings import rank_candidates
+from .storage import CompressedManifestStaticFilesStorage
+from .tallies import TallyFolder, materialize, recount, tally_folder
+from .versions import state_cache
+from .views import AsyncIndexView, AsyncLoginView, AsyncResultsJSONView, AsyncVoterDashboardView
+from .voting import AlreadyVoted, cast_ballot
+
+# Tests that touch the cache get private in-memory ones, and voter passwords
+# are hashed with a token work factor.
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+    'state': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-state'},
+}
+
+
+def writes(queries):
+    return [q['sql'] for q in queries if not q['sql'].lstrip().upper().startswith('SELECT')]
+
+
+def make_voter(dept_id, password='secret', **fields):
+    voter = Voter(name=f'Voter {dept_id}', sex='Female', status='Junior', major_minor='Major',
+                  department='Physics', dept_id=dept_id, **fields)
+    voter.set_password(password)
+    return voter
+
+
+@override_settings(CACHES=LOCAL_CACHES, VOTER_HASHER_ITERATIONS=1)
+class CachedTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        state_cache.clear()
+
+@tag('benchmark')
+class WorkflowBenchmarkTests(SimpleTestCase):
+    """A small run of the workflow benchmark, so the suite catches a broken flow.
+
+    It runs ``manage.py benchmark`` in a subprocess: that gives it the
+    scratch database, caches, media root and activity spool the command
+    always uses, and a file database its client threads can share. Set
+    BENCHMARK_REPORT to a path to keep the JSON report; skip with
+    ``manage.py test --exclude-tag benchmark``.
+    """
+
+    def test_workflow(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.environ.get('BENCHMARK_REPORT') or os.path.join(tmpdir, 'report.json')
+            subprocess.run(
+                [sys.executable, 'manage.py', 'benchmark', 'workflow', '--voters', '20', '--candidates', '3',
+                 '--races', '2', '--workers', '1,4', '--pollers', '1', '--poll-interval', '0.05', '--output', path],
+                cwd=settings.BASE_DIR, env={**os.environ, 'CACHE_DIR': tmpdir}, check=True, stdout=subprocess.DEVNULL,
+            )
+            with open(path) as fh:
+                report = json.load(fh)
+        for run in report['runs']:
+            self.assertEqual(run['errors'], 0, run)
+            self.assertEqual(run['voters_completed'], 20)
+            for endpoint in ('login_page', 'login', 'ballot_page', 'ballot'):
+                self.assertEqual(run['endpoints'][endpoint]['requests'], 20, endpoint)
+
+
+class ReplicaAliasTests(SimpleTestCase):
+    def route(self, vendor, synced_at, as_of=None):
+        with mock.patch('core.routing.replica_synced_at', return_value=synced_at), \
+                mock.patch('core.routing.replica_vendor', return_value=vendor):
+            return replica_alias(as_of)
+
+    def test_no_replica_reads_primary(self):
+        self.assertEqual(self.route('sqlite', None), 'default')
+
+    def test_versioned_reads_need_a_caught_up_sync_copy(self):
+        version = time.time_ns()
+        self.assertEqual(self.route('sqlite', version, as_of=version), REPLICA)
+        self.assertEqual(self.route('sqlite', version - 1, as_of=version), 'default')
+
+    def test_versioned_reads_never_use_a_streaming_standby(self):
+        version = time.time_ns()
+        self.assertEqual(self.route('postgresql', version + 10**9, as_of=version), 'default')
+
+    @override_settings(REPLICA_MAX_LAG=5)
+    def test_lag_tolerant_reads(self):
+        now = time.time_ns()
+        self.assertEqual(self.route('postgresql', now - 10**9), REPLICA)
+        self.assertEqual(self.route('postgresql', now - 10 * 10**9), 'default')
+
+
+class TallyTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Candidate.objects.create(name='Alice', department='Bench', position='President')
+        self.bob = Candidate.objects.create(name='Bob', department='Bench', position='President')
+
+    def cast(self, candidate, count):
+        return Ballot.objects.bulk_create(Ballot(candidate=candidate, position=candidate.position) for _ in range(count))
+
+    def votes(self):
+        return dict(Candidate.objects.with_votes().values_list('name', 'votes'))
+
+    def assert_tallies_match_ledger(self):
+        ledger = {
+            (row['candidate'], row['position']): row['n']
+            for row in Ballot.objects.values('candidate', 'position').annotate(n=Count('id')).order_by()
+        }
+        tallies = {(t.candidate_id, t.position): t.votes for t in Tally.objects.all()}
+        self.assertEqual(tallies, ledger)
+
+    def test_materialize_folds_each_ballot_once(self):
+        self.cast(self.alice, 3)
+        self.cast(self.bob, 2)
+        self.assertEqual(materialize(), 5)
+        self.assertEqual(materialize(), 0)
+        self.assert_tallies_match_ledger()
+
+    def test_ballot_committed_out_of_order_is_still_folded(self):
+        _, late = self.cast(self.alice, 2)
+        # The later ballot was folded while the earlier one's transaction was still open.
+        Ballot.objects.filter(pk=late.pk).update(folded=True)
+        Tally.objects.create(candidate=self.alice, position='President', votes=1)
+        self.assertEqual(self.votes()['Alice'], 2)
+        self.assertEqual(materialize(), 1)
+        self.assert_tallies_match_ledger()
+
+    def test_with_votes_counts_pending_ballots(self):
+        self.cast(self.alice, 2)
+        materialize()
+        self.cast(self.alice, 1)
+        self.cast(self.bob, 4)
+        self.assertEqual(self.votes(), {'Alice': 3, 'Bob': 4})
+        materialize()
+        self.assertEqual(self.votes(), {'Alice': 3, 'Bob': 4})
+
+    def test_cast_ballot_schedules_a_background_fold(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            cast_ballot(make_voter('P-1'), {'President': self.alice.pk})
+        self.assertIn(tally_folder.schedule, callbacks)
+        self.assertFalse(Tally.objects.exists())
+
+    @override_settings(TALLY_FOLD_SECONDS=0)
+    def test_folder_thread_runs_materialize(self):
+        folded = threading.Event()
+        with mock.patch('core.tallies.materialize', side_effect=folded.set):
+            TallyFolder().schedule()
+            self.assertTrue(folded.wait(5))
+
+    def test_recount_rebuilds_from_the_ledger(self):
+        self.cast(self.alice, 3)
+        materialize()
+        Tally.objects.update(votes=99)
+        self.cast(self.bob, 1)
+        self.assertEqual(recount(), 4)
+        self.assert_tallies_match_ledger()
+        self.assertEqual(self.votes(), {'Alice': 3, 'Bob': 1})
+
+
+class CastBallotTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+        self.carol = Candidate.objects.create(name='Carol', department='Physics', position='Secretary')
+        self.voter = make_voter('P-1')
+
+    def test_records_one_ballot_per_race(self):
+        cast_ballot(self.voter, {'President': self.alice.pk, 'Secretary': str(self.carol.pk)})
+        self.assertEqual(set(Ballot.objects.values_list('position', 'candidate')),
+                         {('President', self.alice.pk), ('Secretary', self.carol.pk)})
+        self.voter.refresh_from_db()
+        self.assertTrue(self.voter.has_voted)
+
+    def test_second_ballot_is_rejected(self):
+        cast_ballot(self.voter, {'President': self.alice.pk})
+        with self.assertRaises(AlreadyVoted):
+            cast_ballot(Voter.objects.get(pk=self.voter.pk), {'Secretary': self.carol.pk})
+        self.assertEqual(Ballot.objects.count(), 1)
+
+    def test_invalid_ballots_write_nothing(self):
+        for selections in ({}, {'President': self.carol.pk}, {'Treasurer': self.alice.pk}, {'President': 'x'}):
+            with self.subTest(selections=selections), self.assertRaises(InvalidBallot):
+                cast_ballot(self.voter, selections)
+        self.assertFalse(Ballot.objects.exists())
+        self.assertFalse(Voter.objects.get(pk=self.voter.pk).has_voted)
+
+
+class BallotPageTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('core.election._cached', (None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        now = timezone.now()
+        ElectionSetting.objects.create(start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+            Candidate.objects.create(name='Carol', department='Physics', position='Secretary')
+
+    def test_races_are_built_once_per_candidate_set(self):
+        with self.assertNumQueries(1):
+            races = ballot_races()
+        self.assertEqual([(position, [c['name'] for c in race]) for position, race in races],
+                         [('President', ['Alice']), ('Secretary', ['Carol'])])
+        with self.assertNumQueries(0):
+            self.assertEqual(ballot_races(), races)
+        with self.captureOnCommitCallbacks(execute=True):
+            Candidate.objects.create(name='Bob', department='Chemistry', position='President')
+        self.assertEqual([c['name'] for c in ballot_races()[0][1]], ['Alice', 'Bob'])
+
+    def candidate_queries(self):
+        session = self.client.session
+        session['voter_id'] = self.voter.pk
+        session.save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('voter_dashboard'))
+        self.assertContains(response, f'value="{self.alice.pk}"')
+        return [query['sql'] for query in queries if 'core_candidate' in query['sql']]
+
+    def test_cached_ballot_fragment_skips_the_candidates(self):
+        self.voter = make_voter('B-1')
+        self.assertEqual(len(self.candidate_queries()), 1)
+        self.assertEqual(self.candidate_queries(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.name = 'Alicia'
+            self.alice.save()
+        self.assertEqual(len(self.candidate_queries()), 1)
+        self.assertContains(self.client.get(reverse('voter_dashboard')), 'Alicia')
+
+
+class KeysetPageTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        statuses = ['Freshman', 'Senior', 'Junior', 'Senior', 'Freshman', 'Senior', 'Junior']
+        self.voters = Voter.objects.bulk_create(
+            Voter(name=f'Voter {i}', sex='Male', status=status, major_minor='Major', department='Physics',
+                  dept_id=f'D-{i}', password='x', has_voted=i % 2 == 0)
+            for i, status in enumerate(statuses)
+        )
+        self.ids = [voter.pk for voter in self.voters]
+
+    def page(self, **params):
+        params = {'size': '3', **{key: str(value) for key, value in params.items()}}
+        rows, next_cursor, prev_cursor = keyset_page(filter_voters(params), params)
+        return [row.pk for row in rows], next_cursor, prev_cursor
+
+    def test_forward_cursors(self):
+        ids = self.ids
+        self.assertEqual(self.page(), (ids[0:3], ids[2], None))
+        self.assertEqual(self.page(after=ids[2]), (ids[3:6], ids[5], ids[3]))
+        self.assertEqual(self.page(after=ids[5]), (ids[6:], None, ids[6]))
+
+    def test_backward_cursors(self):
+        ids = self.ids
+        self.assertEqual(self.page(before=ids[6]), (ids[3:6], ids[5], ids[3]))
+        self.assertEqual(self.page(before=ids[3]), (ids[0:3], ids[2], None))
+
+    def test_filters_apply_across_pages(self):
+        seniors = [voter.pk for voter in self.voters if voter.status == 'Senior']
+        self.assertEqual(self.page(status='Senior', size=2), (seniors[:2], seniors[1], None))
+        self.assertEqual(self.page(status='Senior', size=2, after=seniors[1]), (seniors[2:], None, seniors[2]))
+        self.assertEqual(self.page(has_voted=1, size=10)[0], [voter.pk for voter in self.voters if voter.has_voted])
+        self.assertEqual(self.page(q='d-4')[0], [self.ids[4]])
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.page(size=0)[0]), 1)
+        self.assertEqual(len(self.page(size='many')[0]), min(PAGE_SIZE, len(self.ids)))
+
+
+class ImportVotersTests(CachedTestCase):
+    def row(self, dept_id, **fields):
+        return {'name': 'Ada Lovelace', 'sex': 'Female', 'status': 'Senior', 'major_minor': 'Minor',
+                'department': 'Mathematics', 'dept_id': dept_id, 'password': 'secret', **fields}
+
+    def test_validate_row(self):
+        self.assertIsNone(validate_row(self.row('M-1')))
+        self.assertEqual(validate_row(self.row('M-1', sex='', password='')), 'missing sex, password')
+        self.assertEqual(validate_row(self.row('M-1', status='Alumnus')), "invalid status 'Alumnus'")
+        self.assertEqual(validate_row(self.row('M-' + '1' * 50)), 'dept_id is longer than 50 characters')
+        # Passwords are stored hashed, so the raw value isn't held to the column length.
+        self.assertIsNone(validate_row(self.row('M-1', password='p' * 200)))
+
+    def test_bad_rows_are_reported_and_the_rest_saved(self):
+        make_voter('M-0')
+        rows = [
+            (2, self.row('M-1')),
+            (3, self.row('M-1')),
+            (4, self.row('M-0')),
+            (5, self.row('M-2', major_minor='Both')),
+            (6, self.row('M-3', name='x' * 101)),
+            (7, self.row('M-4')),
+        ]
+        report = import_voters(rows)
+        self.assertEqual((report.rows, report.created), (6, 2))
+        self.assertEqual([line for line, _ in report.errors], [3, 5, 6, 4])
+        self.assertIn('duplicate dept_id M-1', report.errors[0][1])
+        self.assertIn('already registered', report.errors[3][1])
+        self.assertTrue(Voter.objects.get(dept_id='M-4').check_password('secret'))
+
+    def upload(self, name, content):
+        self.client.force_login(User.objects.create_user('admin', password='pw'))
+        response = self.client.post(reverse('import_voters'), {'voter-roll': SimpleUploadedFile(name, content)}, follow=True)
+        return [str(message) for message in response.context['messages']]
+
+    def test_unreadable_csv_is_a_form_error_and_imports_nothing(self):
+        header = ','.join(COLUMNS) + '\n'
+        good = ''.join(f'Ada,Female,Senior,Minor,Mathematics,M-{i},secret\n' for i in range(3))
+        with mock.patch('core.imports.BATCH_SIZE', 2):
+            messages = self.upload('roll.csv', (header + good + 'Bob,Male,Senior,Minor,' + 'M' * 200_000 + ',M-9,secret\n').encode())
+        self.assertEqual(len(messages), 1)
+        self.assertIn('Could not read roll.csv: line 5', messages[0])
+        self.assertFalse(Voter.objects.exists())
+
+    def test_corrupt_xlsx_is_a_form_error(self):
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            expected = 'needs openpyxl installed'
+        else:
+            expected = 'not a valid XLSX workbook'
+        messages = self.upload('roll.xlsx', b'not a zip file')
+        self.assertEqual(len(messages), 1)
+        self.assertIn(expected, messages[0])
+        self.assertFalse(Voter.objects.exists())
+
+
+class RankCandidatesTests(SimpleTestCase):
+    def rank(self, *votes, position='President'):
+        candidates = [{'id': i, 'position': position, 'votes': v} for i, v in enumerate(votes)]
+        rank_candidates(candidates)
+        return [(c['rank'], c['status']) for c in sorted(candidates, key=lambda c: c['id'])]
+
+    def test_sole_leader(self):
+        self.assertEqual(self.rank(3, 7, 1), [(2, 'Running'), (1, 'Leading'), (3, 'Running')])
+
+    def test_shared_first_place_is_tied(self):
+        self.assertEqual(self.rank(5, 2, 5), [(1, 'Tied'), (3, 'Running'), (1, 'Tied')])
+
+    def test_ties_below_first_share_a_rank(self):
+        self.assertEqual(self.rank(9, 4, 4, 1), [(1, 'Leading'), (2, 'Running'), (2, 'Running'), (4, 'Running')])
+
+    def test_no_votes_is_not_a_tie(self):
+        self.assertEqual(self.rank(0, 0), [(1, 'Running'), (1, 'Running')])
+
+    def test_positions_are_ranked_separately(self):
+        candidates = [{'id': 1, 'position': 'President', 'votes': 2}, {'id': 2, 'position': 'Secretary', 'votes': 1}]
+        rank_candidates(candidates)
+        self.assertEqual([(c['rank'], c['status']) for c in candidates], [(1, 'Leading'), (1, 'Leading')])
+
+
+@override_settings(VOTER_LOGIN_ATTEMPTS=2)
+class VoterBackendTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.voter = make_voter('L-1')
+        self.backend = VoterBackend()
+
+    def test_correct_password(self):
+        self.assertEqual(self.backend.authenticate(None, dept_id='L-1', password='secret'), self.voter)
+        self.assertIsNone(self.backend.authenticate(None, dept_id='L-1', password='wrong'))
+
+    def test_failures_throttle_the_dept_id(self):
+        for _ in range(2):
+            self.assertIsNone(self.backend.authenticate(None, dept_id='L-1', password='wrong'))
+        with self.assertRaises(LoginThrottled):
+            self.backend.authenticate(None, dept_id='L-1', password='secret')
+        # Unknown ids are counted the same way.
+        for _ in range(2):
+            self.backend.authenticate(None, dept_id='nobody', password='wrong')
+        with self.assertRaises(LoginThrottled):
+            self.backend.authenticate(None, dept_id='nobody', password='wrong')
+
+    def test_failures_from_one_address_do_not_lock_out_another(self):
+        attacker, voter = RequestFactory(REMOTE_ADDR='203.0.113.9'), RequestFactory(REMOTE_ADDR='198.51.100.7')
+        for _ in range(2):
+            self.assertIsNone(self.backend.authenticate(attacker.post('/'), dept_id='L-1', password='wrong'))
+        with self.assertRaises(LoginThrottled):
+            self.backend.authenticate(attacker.post('/'), dept_id='L-1', password='secret')
+        self.assertEqual(self.backend.authenticate(voter.post('/'), dept_id='L-1', password='secret'), self.voter)
+
+    def test_success_resets_the_count(self):
+        self.backend.authenticate(None, dept_id='L-1', password='wrong')
+        self.assertEqual(self.backend.authenticate(None, dept_id='L-1', password='secret'), self.voter)
+        self.backend.authenticate(None, dept_id='L-1', password='wrong')
+        self.assertEqual(self.backend.authenticate(None, dept_id='L-1', password='secret'), self.voter)
+
+    def test_retry_within_the_token_ttl_skips_the_hasher(self):
+        self.backend.authenticate(None, dept_id='L-1', password='secret')
+        with mock.patch.object(VoterBackend, '_check') as check:
+            self.assertEqual(self.backend.authenticate(None, dept_id='L-1', password='secret'), self.voter)
+        check.assert_not_called()
+
+
+class ElectionSettingsTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('core.election._cached', (None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        now = timezone.now()
+        self.setting = ElectionSetting.objects.create(start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+
+    def test_cached_until_the_version_changes(self):
+        first = election_settings()
+        with self.assertNumQueries(0):
+            self.assertIs(election_settings(), first)
+            self.assertTrue(election_open())
+        # Another worker saved the row: only the shared version key tells us.
+        ElectionSetting.objects.filter(pk=self.setting.pk).update(end_date=timezone.now() - timedelta(hours=1))
+        self.assertTrue(election_open())
+        bump_settings_version()
+        self.assertFalse(election_open())
+        self.assertIsNot(election_settings(), first)
+
+    def test_save_invalidates_on_commit(self):
+        self.assertEqual(election_settings().admin_name, 'Admin User')
+        setting = ElectionSetting.load()
+        setting.admin_name = 'Returning Officer'
+        with self.captureOnCommitCallbacks(execute=True):
+            setting.save()
+        self.assertEqual(election_settings().admin_name, 'Returning Officer')
+
+    async def test_async_reader_shares_the_cache(self):
+        first = await aelection_settings()
+        self.assertIs(await sync_to_async(election_settings)(), first)
+        await sync_to_async(bump_settings_version)()
+        self.assertIsNot(await aelection_settings(), first)
+        self.assertTrue(await aelection_open())
+
+
+class ActivityQueueTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.spool = os.path.join(tmpdir.name, 'activity.spool')
+        override = override_settings(ACTIVITY_SPOOL=self.spool, ACTIVITY_FLUSH_SIZE=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.queue = ActivityQueue()
+        self.queue._thread = mock.Mock()  # no flusher thread; the tests flush by hand
+        patcher = mock.patch('core.activity.activity_queue', self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def log(self, description, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_activity(type='Vote cast', description=description, **fields)
+
+    def test_entries_are_queued_on_commit_and_written_in_one_insert(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            log_activity(type='Vote cast', description='one')
+        self.assertEqual(self.queue._entries, [])
+        for callback in callbacks:
+            callback()
+        self.log('two')
+        self.assertTrue(self.queue._wake.is_set())  # ACTIVITY_FLUSH_SIZE reached
+        with self.assertNumQueries(1):
+            self.assertEqual(self.queue.flush(), 2)
+        self.assertEqual(list(ActivityLog.objects.order_by('pk').values_list('description', flat=True)), ['one', 'two'])
+        self.assertEqual(self.queue.flush(), 0)
+
+    def test_failed_write_is_spooled_and_replayed(self):
+        self.log('spooled', color='green')
+        with mock.patch.object(ActivityLog.objects, 'bulk_create', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('core.activity', 'WARNING'):
+                self.assertEqual(self.queue.flush(), 0)
+        self.assertTrue(os.path.exists(self.spool))
+        self.assertFalse(ActivityLog.objects.exists())
+        self.assertEqual(ActivityQueue().flush(), 1)  # any process replays the spool
+        entry = ActivityLog.objects.get()
+        self.assertEqual((entry.description, entry.color), ('spooled', 'green'))
+        self.assertEqual(os.listdir(os.path.dirname(self.spool)), [])
+
+    def test_shutdown_spools_what_it_cannot_write(self):
+        self.log('late')
+        with mock.patch.object(self.queue, 'flush', side_effect=RuntimeError('interpreter shutting down')):
+            self.queue.shutdown()
+        with open(self.spool) as fh:
+            self.assertEqual(json.loads(fh.read())['description'], 'late')
+
+    def test_rollup_folds_old_entries_into_daily_counts(self):
+        old = timezone.now() - timedelta(days=40)
+        ActivityLog.objects.bulk_create([ActivityLog(type='Vote cast', description=str(i), time=old) for i in range(3)])
+        ActivityLog.objects.create(type='Vote cast', description='recent', time=timezone.now())
+        self.assertEqual(rollup_activity(days=30), 3)
+        self.assertEqual(rollup_activity(days=30), 0)
+        self.assertEqual(list(ActivityRollup.objects.values_list('day', 'type', 'count')), [(old.date(), 'Vote cast', 3)])
+        self.assertEqual(list(ActivityLog.objects.values_list('description', flat=True)), ['recent'])
+
+
+class ThumbnailTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        override = override_settings(MEDIA_ROOT=tmpdir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def photo(self, name='candidates/alice.png', size=(300, 200)):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, 'PNG')
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_square_jpeg_and_webp_thumbnails(self):
+        name = self.photo()
+        self.assertFalse(thumbnails_ready(name))
+        self.assertEqual(build_derivatives(name), 4)
+        self.assertTrue(thumbnails_ready(name))
+        for size in THUMB_SIZES:
+            for ext, fmt in [('jpg', 'JPEG'), ('webp', 'WEBP')]:
+                with default_storage.open(derivative_name(name, size, ext)) as fh, Image.open(fh) as thumb:
+                    self.assertEqual((thumb.format, thumb.size), (fmt, (size, size)))
+
+    def test_variants_fall_back_to_the_original_until_ready(self):
+        candidate = Candidate(name='Alice', department='Physics', position='President', photo=self.photo())
+        self.assertIsNone(Candidate(name='Bob').photo_variants)
+        self.assertEqual(candidate.photo_variants, {'src': candidate.photo.url, 'srcset': ''})
+        build_derivatives(candidate.photo.name)
+        self.assertEqual(candidate.photo_variants, {
+            'src': '/media/thumbs/candidates/alice.64.jpg',
+            'srcset': '/media/thumbs/candidates/alice.64.webp 64w, /media/thumbs/candidates/alice.128.webp 128w',
+        })
+
+    def test_saved_photo_is_scheduled_once(self):
+        executor = mock.Mock()
+        with mock.patch('core.images._get_executor', return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                candidate = Candidate.objects.create(name='Alice', department='Physics', position='President', photo=self.photo())
+            schedule_derivatives(candidate.photo.name)  # already on its way
+        executor.submit.assert_called_once()
+        build, name, on_done = executor.submit.call_args.args
+        self.assertEqual(name, candidate.photo.name)
+        with mock.patch('core.images.build_derivatives', side_effect=OSError('truncated')), self.assertLogs('core.images'):
+            build(name, on_done)  # a broken upload is logged and forgotten, not retried forever
+        build(name, on_done)
+        self.assertTrue(thumbnails_ready(name))
+        with mock.patch('core.images._get_executor', return_value=executor):
+            schedule_derivatives(name)
+        executor.submit.assert_called_once()
+
+
+class AvatarTests(SimpleTestCase):
+    def test_initials_and_colours(self):
+        svg, _ = avatar_svg('ada  king lovelace', 'FF0000', 'fff')
+        self.assertIn('fill="#ff0000"', svg)
+        self.assertIn('fill="#fff"', svg)
+        self.assertIn('>AK</text>', svg)
+        self.assertIn('>?</text>', avatar_svg('')[0])
+
+    def test_random_background_is_stable_per_name(self):
+        self.assertEqual(avatar_svg('Alice', 'random'), avatar_svg('Alice', 'random'))
+        self.assertNotEqual(avatar_svg('Alice', 'random')[1], avatar_svg('Bob', 'random')[1])
+        # Same initials and colours draw the same image, so they share the ETag.
+        self.assertEqual(avatar_svg('Ada Lovelace', 'abc')[1], avatar_svg('Alan Lee', 'abc')[1])
+
+    def test_markup_is_escaped_and_bad_colours_ignored(self):
+        svg, _ = avatar_svg('<script>', '"/><script>', 'red')
+        self.assertIn('>&lt;</text>', svg)
+        self.assertNotIn('<script', svg)
+        self.assertIn('fill="#ffffff"', svg)
+
+    def test_view_is_cacheable_and_revalidates(self):
+        url = reverse('avatar') + '?name=Ada+Lovelace&background=random&color=fff'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn("default-src 'none'", response['Content-Security-Policy'])
+        self.assertIn(b'>AL</text>', response.content)
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+
+
+ASYNC_ROUTES = {
+    'index': AsyncIndexView, 'login': AsyncLoginView, 'results_json': AsyncResultsJSONView, 'voter_dashboard': AsyncVoterDashboardView,
+}
+
+
+class AsyncURLConf:
+    # core.urls as routed with ASYNC_VIEWS on; the swap happens at import time.
+    urlpatterns = [
+        path(str(pattern.pattern), ASYNC_ROUTES[pattern.name].as_view(), name=pattern.name)
+        if pattern.name in ASYNC_ROUTES else pattern
+        for pattern in core_urls.urlpatterns
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf, VOTER_LOGIN_ATTEMPTS=1)
+class AsyncViewTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('core.election._cached', (None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        now = timezone.now()
+        ElectionSetting.objects.create(start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+        self.alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+        self.voter = make_voter('A-1')
+        self.client = AsyncClient()
+
+    def messages(self, response):
+        return [str(message) for message in response.context['messages']]
+
+    async def test_voter_logs_in_and_votes(self):
+        response = await self.client.get(reverse('index'))
+        self.assertEqual([c['name'] for c in response.context['candidates']], ['Alice'])
+        response = await self.client.post(reverse('index'), {'role': 'voter', 'dept_id': 'A-1', 'password': 'secret'})
+        self.assertRedirects(response, reverse('voter_dashboard'), fetch_redirect_response=False)
+        response = await self.client.get(reverse('voter_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'value="{self.alice.pk}"')
+        response = await self.client.post(reverse('voter_dashboard'), {'ballot-President': self.alice.pk})
+        self.assertTrue(response.context['success'])
+        self.assertEqual(await Ballot.objects.filter(voter=self.voter, candidate=self.alice).acount(), 1)
+        # The session was cleared with the vote.
+        response = await self.client.get(reverse('voter_dashboard'))
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+
+    async def test_failed_logins_are_throttled(self):
+        form = {'role': 'voter', 'dept_id': 'A-1', 'password': 'wrong'}
+        self.assertEqual(self.messages(await self.client.post(reverse('index'), form)), ['Invalid credentials'])
+        form['password'] = 'secret'
+        response = await self.client.post(reverse('index'), form)
+        self.assertEqual(self.messages(response), ['Too many attempts, please try again later'])
+
+    async def test_results_json_revalidates(self):
+        self.assertEqual((await self.client.get(reverse('results_json'))).status_code, 401)
+        await self.client.aforce_login(await User.objects.acreate(username='admin'))
+        response = await self.client.get(reverse('results_json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['name'] for c in response.json()['candidates']], ['Alice'])
+        response = await self.client.get(reverse('results_json'), headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+
+class CandidateListTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+        Candidate.objects.create(name='Bob', department='Chemistry', position='President')
+        ElectionSetting.objects.create(start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1))
+        cast_ballot(make_voter('P-1'), {'President': self.alice.pk})
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+
+    def test_list_after_a_vote_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('candidates'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({c.name: c.votes for c in response.context['candidates']}, {'Alice': 1, 'Bob': 0})
+        self.assertEqual(response.context['total_votes'], 1)
+        self.assertEqual(writes(queries), [])
+
+    def test_json_after_a_vote_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('candidates_json'), {'department': 'Physics'})
+        self.assertEqual(writes(queries), [])
+        self.assertEqual([(c['name'], c['votes'], c['status'], c['photo']) for c in response.json()['results']],
+                         [('Alice', 1, 'Leading', None)])
+
+
+class DashboardTests(CachedTestCase):
+    def test_dashboard_after_a_vote_writes_nothing(self):
+        ElectionSetting.objects.create(start_date=timezone.now(), end_date=timezone.now() + timedelta(days=1))
+        alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+        cast_ballot(make_voter('P-1'), {'President': alice.pk})
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['votes'] for c in response.context['candidates']], [1])
+        self.assertEqual(writes(queries), [])
+        self.assertFalse(Ballot.objects.filter(folded=True).exists())
+
+
+class ResultsSnapshotTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+
+    def test_cached_snapshot_runs_no_queries(self):
+        snapshot = results_snapshot()
+        with self.assertNumQueries(0):
+            self.assertEqual(results_snapshot(), snapshot)
+
+    def test_new_version_is_rebuilt_once(self):
+        first = results_snapshot()
+        cast_ballot(make_voter('P-1'), {'President': self.alice.pk})
+        bump_results_version()
+        second = results_snapshot()
+        self.assertGreater(second['version'], first['version'])
+        self.assertEqual(second['candidates'][0]['votes'], 1)
+        self.assertIsNone(state_cache.get(REBUILD_KEY))
+
+    def test_previous_snapshot_is_served_during_a_rebuild(self):
+        first = results_snapshot()
+        bump_results_version()
+        state_cache.add(REBUILD_KEY, 0)  # another process is rebuilding
+        with self.assertNumQueries(0):
+            self.assertEqual(results_snapshot(), first)
+        state_cache.delete(REBUILD_KEY)
+        self.assertGreater(results_snapshot()['version'], first['version'])
+
+
+@mock.patch('core.live.POLL_INTERVAL', 0.01)
+class ResultsPublisherTests(SimpleTestCase):
+    def setUp(self):
+        self.current = self.snapshot(1, President=3)
+        self.failures = 0
+        state = mock.Mock()
+        state.aget = mock.AsyncMock(side_effect=lambda key: self.current['version'])
+        for target, value in [('core.live.state_cache', state), ('core.live.results_snapshot', self.build)]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def snapshot(self, version, **votes):
+        candidates = [{'id': i, 'position': position, 'votes': count} for i, (position, count) in enumerate(votes.items())]
+        return {'version': version, 'candidates': candidates, 'year_percent': {}, 'major_percent': {}}
+
+    def build(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('cache unavailable')
+        return self.current
+
+    async def next_event(self, queue):
+        return await asyncio.wait_for(queue.get(), 1)
+
+    async def test_snapshot_then_delta(self):
+        publisher = ResultsPublisher()
+        queue = publisher.subscribe()
+        self.assertEqual(await self.next_event(queue), ('snapshot', self.current))
+        self.current = self.snapshot(2, President=4)
+        event, data = await self.next_event(queue)
+        self.assertEqual((event, data), ('delta', {'version': 2, 'candidates': [self.current['candidates'][0]]}))
+        publisher.unsubscribe(queue)
+        await asyncio.wait_for(publisher.task, 1)
+        self.assertIsNone(publisher.snapshot)
+
+    async def test_lagging_subscriber_is_resynced_with_a_snapshot(self):
+        publisher = ResultsPublisher()
+        publisher.snapshot = self.current
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        publisher.subscribers.add(queue)
+        for version in range(SUBSCRIBER_BACKLOG + 1):
+            publisher.publish(('delta', {'version': version}))
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait(), ('snapshot', self.current))
+
+    async def test_failed_poll_is_logged_and_retried(self):
+        self.failures = 2
+        publisher = ResultsPublisher()
+        with self.assertLogs('core.live', 'ERROR') as logs:
+            queue = publisher.subscribe()
+            self.assertEqual(await self.next_event(queue), ('snapshot', self.current))
+        self.assertEqual(len(logs.records), 2)
+        self.assertFalse(publisher.task.done())
+        publisher.unsubscribe(queue)
+        await asyncio.wait_for(publisher.task, 1)
+
+    async def test_stream_sends_the_current_snapshot_first(self):
+        publisher = get_publisher()
+        publisher.snapshot = self.current
+        stream = results_stream()
+        try:
+            self.assertEqual(await anext(stream), sse('snapshot', self.current))
+        finally:
+            await stream.aclose()
+        self.assertFalse(publisher.subscribers)
+        await asyncio.wait_for(publisher.task, 1)
+
+
+class ReportTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.directory = Path(tmpdir.name)
+        override = override_settings(REPORTS_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.built = []
+
+    def build(self, snapshot):
+        self.built.append(snapshot['version'])
+        return f'report {snapshot["version"]}'.encode()
+
+    def files(self):
+        return sorted(path.name for path in self.directory.iterdir())
+
+    def snapshot(self, version):
+        return {'version': version, 'candidates': [], 'year_percent': {}, 'major_percent': {}}
+
+    def test_concurrent_requests_share_one_render(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build(snapshot):
+            started.set()
+            release.wait(5)
+            return self.build(snapshot)
+
+        with mock.patch.dict('core.reports.REPORTS', {'pdf': (slow_build, 'pdf', 'results.pdf')}):
+            first = render_report('pdf', self.snapshot(7))
+            started.wait(5)
+            self.assertIs(render_report('pdf', self.snapshot(7)), first)
+            release.set()
+            with open_report('pdf', self.snapshot(7)) as fh:
+                self.assertEqual(fh.read(), b'report 7')
+        self.assertEqual(self.built, [7])
+
+    def test_older_versions_are_pruned(self):
+        with mock.patch.dict('core.reports.REPORTS', {'pdf': (self.build, 'pdf', 'results.pdf')}):
+            for version in (3, 9, 5):
+                write_report('pdf', self.snapshot(version), str(report_path('pdf', version)))
+        # 9 was written by a faster worker and must survive the slower render of 5.
+        self.assertEqual(self.files(), ['results-5.pdf', 'results-9.pdf'])
+
+    def test_failed_render_leaves_no_temporary_file(self):
+        def broken_build(snapshot):
+            raise RuntimeError('render failed')
+
+        with mock.patch.dict('core.reports.REPORTS', {'pdf': (broken_build, 'pdf', 'results.pdf')}):
+            with self.assertRaises(RuntimeError):
+                write_report('pdf', self.snapshot(1), str(report_path('pdf', 1)))
+        self.assertEqual(self.files(), [])
+
+    def test_reports_are_rendered_on_download_only(self):
+        Candidate.objects.create(name='Alice', department='Physics', position='President')
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+        self.assertEqual(self.client.get(reverse('results')).status_code, 200)
+        self.assertFalse(self.directory.exists() and self.files())
+        response = self.client.get(reverse('download_pdf'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(self.files(), [f'results-{results_snapshot()["version"]}.pdf'])
+
+
+class ExportTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.voters = [make_voter(f'E-{i}') for i in range(3)]
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+
+    def export(self, dataset, fmt):
+        response = self.client.get(reverse('export', args=[dataset, fmt]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{dataset}.{fmt}"')
+        return list(response.streaming_content)
+
+    def test_voters_csv_streams_in_chunks_without_passwords(self):
+        with mock.patch('core.exports.CHUNK_SIZE', 2):
+            chunks = self.export('voters', 'csv')
+        self.assertEqual(len(chunks), 3)  # header, two rows, one row
+        lines = b''.join(chunks).decode().splitlines()
+        self.assertEqual(lines[0], 'id,name,sex,status,major_minor,department,dept_id,has_voted')
+        self.assertEqual([line.split(',')[6] for line in lines[1:]], ['E-0', 'E-1', 'E-2'])
+        for voter in self.voters:
+            self.assertNotIn(voter.password.encode(), b''.join(chunks))
+
+    def test_ballots_ndjson(self):
+        alice = Candidate.objects.create(name='Alice', department='Physics', position='President')
+        cast_ballot(self.voters[0], {'President': alice.pk})
+        rows = [json.loads(line) for line in b''.join(self.export('ballots', 'ndjson')).splitlines()]
+        self.assertEqual([(row['voter_id'], row['candidate_id'], row['position']) for row in rows],
+                         [(self.voters[0].pk, alice.pk, 'President')])
+        self.assertEqual(set(rows[0]), {'id', 'voter_id', 'candidate_id', 'position', 'cast_at'})
+
+    def test_unknown_dataset_or_format_is_not_found(self):
+        self.assertEqual(self.client.get(reverse('export', args=['users', 'csv'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('export', args=['voters', 'xml'])).status_code, 404)
+
+    def test_anonymous_requests_are_redirected(self):
+        self.client.logout()
+        self.assertRedirects(self.client.get(reverse('export', args=['voters', 'csv'])), reverse('login'),
+                             fetch_redirect_response=False)
+
+
+class SidebarCacheTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('core.election._cached', (None, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.setting = ElectionSetting.objects.create(admin_name='Returning Officer')
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+
+    def test_sidebar_is_rebuilt_when_the_settings_change(self):
+        calls = []
+
+        def counted_settings():
+            calls.append(1)
+            return election_settings()
+
+        with mock.patch('core.context_processors.election_settings', counted_settings):
+            self.assertContains(self.client.get(reverse('candidates')), 'Returning Officer')
+            self.assertEqual(len(calls), 1)
+            self.assertContains(self.client.get(reverse('candidates')), 'Returning Officer')
+            self.assertEqual(len(calls), 1)  # served from the cached fragment
+        self.setting.admin_name = 'Deputy Officer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.setting.save()
+        self.assertContains(self.client.get(reverse('candidates')), 'Deputy Officer')
+
+
+class StaticFileTests(SimpleTestCase):
+    CSS = b'.ballot { margin: 0 auto; padding: 1rem; }\n' * 50
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = tmpdir.name
+        override = override_settings(STATIC_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.root, base_url='/static/')
+        for name, content in [('app.css', self.CSS), ('tiny.txt', b'ok')]:
+            with open(os.path.join(self.root, name), 'wb') as fh:
+                fh.write(content)
+        processed = list(self.storage.post_process({name: (self.storage, name) for name in ('app.css', 'tiny.txt')}))
+        self.hashed = self.storage.hashed_files['app.css']
+        hashed_names = frozenset(self.storage.hashed_files.values())
+        patcher = mock.patch('core.views.hashed_static_names', return_value=hashed_names)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.assertTrue(processed)
+
+    def test_collectstatic_gzips_text_worth_compressing(self):
+        for name in ('app.css', self.hashed):
+            with open(os.path.join(self.root, name + '.gz'), 'rb') as fh:
+                self.assertEqual(gzip.decompress(fh.read()), self.CSS)
+        # Two bytes don't shrink, so they get no .gz copy.
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'tiny.txt.gz')))
+
+    def test_gzip_is_sent_only_when_accepted(self):
+        url = '/static/' + self.hashed
+        response = self.client.get(url, headers={'accept-encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.CSS)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        response = self.client.get(url)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), self.CSS)
+        response = self.client.get('/static/tiny.txt', headers={'accept-encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_unhashed_names_revalidate(self):
+        response = self.client.get('/static/app.css')
+        self.assertEqual(response['Cache-Control'], f'public, max-age={settings.STATIC_MAX_AGE}')
+        cached = self.client.get('/static/app.css', headers={'if-modified-since': response['Last-Modified']})
+        self.assertEqual(cached.status_code, 304)
+
+    def test_missing_or_outside_files_are_not_found(self):
+        self.assertEqual(self.client.get('/static/missing.css').status_code, 404)
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/static/%2e%2e/%2e%2e/manage.py').status_code, 404)
+
+
+class MetricsTests(CachedTestCase):
+    def counter(self, text, alias, result):
+        match = re.search(rf'^election_cache_requests_total{{cache="{alias}",result="{result}"}} (\d+)$', text, re.M)
+        return int(match.group(1)) if match else 0
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_cache_lookups_are_counted_per_alias(self):
+        before = self.scrape()
+        cache.set('metrics-test', 1)
+        cache.get('metrics-test')
+        cache.get('metrics-test-missing')
+        state_cache.get('metrics-test-missing')
+        after = self.scrape()
+        self.assertIn('# TYPE election_cache_requests_total counter', after)
+        self.assertIn('election_request_duration_seconds_bucket{view="metrics",le="0.005"}', after)
+        for alias, result, moved in [('default', 'hit', 1), ('default', 'miss', 1), ('state', 'miss', 1), ('state', 'hit', 0)]:
+            with self.subTest(alias=alias, result=result):
+                self.assertEqual(self.counter(after, alias, result) - self.counter(before, alias, result), moved)
+
+    def test_other_clients_are_refused(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9').status_code, 403)
+
+
+class ResultsJSONTests(CachedTestCase):
+    def setUp(self):
+        super().setUp()
+        Candidate.objects.create(name='Alice', department='Physics', position='President')
+        self.url = reverse('results_json')
+
+    def test_anonymous_requests_are_refused(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'error': 'Unauthorized'})
+        self.assertNotIn('ETag', response)
+
+    def test_unchanged_results_are_not_modified(self):
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['name'] for c in response.json()['candidates']], ['Alice'])
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        bump_results_version()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_reports_are_not_rendered_again(self):
+        self.client.force_login(User.objects.create_user('admin', password='x'))
+        with tempfile.TemporaryDirectory() as tmpdir, override_settings(REPORTS_DIR=tmpdir):
+            for name, signature in [('download_pdf', b'%PDF'), ('download_word', b'PK')]:
+                with self.subTest(name):
+                    url = reverse(name)
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(b''.join(response.streaming_content).startswith(signature))
+                    self.assertEqual(response['Cache-Control'], 'private, no-cache')
+                    with mock.patch('core.views.open_report') as open_report:
+                        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+                        since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                        self.assertEqual(since.status_code, 304)
+                    open_report.assert_not_called()
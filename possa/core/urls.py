@@ -1,12 +1,16 @@
 # election_project/election_app/urls.py
+from django.conf import settings
 from django.urls import path
 from .views import (
-    IndexView, SetupAdminView, LoginView, LogoutView, DashboardView, CandidatesView,
-    AddCandidateView, EditCandidateView, DeleteCandidateView, VotersView,
-    AddVoterView, EditVoterView, DeleteVoterView, ResultsView, ResultsJSONView, DownloadPDFView, DownloadWordView, SettingsView,
-    VoterDashboardView
+    IndexView, SetupAdminView, LoginView, LogoutView, DashboardView, CandidatesView, CandidatesJSONView,
+    AddCandidateView, EditCandidateView, DeleteCandidateView, VotersView, VotersJSONView,
+    AddVoterView, ImportVotersView, EditVoterView, DeleteVoterView, ResultsView, ResultsJSONView, ResultsStreamView, DownloadPDFView, DownloadWordView, ExportView, AvatarView, MetricsView, SettingsView,
+    VoterDashboardView, AsyncIndexView, AsyncLoginView, AsyncResultsJSONView, AsyncVoterDashboardView,
 )
 
+if settings.ASYNC_VIEWS:
+    IndexView, LoginView, ResultsJSONView, VoterDashboardView = AsyncIndexView, AsyncLoginView, AsyncResultsJSONView, AsyncVoterDashboardView
+
 urlpatterns = [
     path('', IndexView.as_view(), name='index'),
     path('setup-admin/', SetupAdminView.as_view(), name='setup_admin'),
@@ -14,17 +18,24 @@ urlpatterns = [
     path('logout/', LogoutView.as_view(), name='logout'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('candidates/', CandidatesView.as_view(), name='candidates'),
+    path('candidates/json/', CandidatesJSONView.as_view(), name='candidates_json'),
     path('candidates/add/', AddCandidateView.as_view(), name='add_candidate'),
     path('candidates/edit/<int:pk>/', EditCandidateView.as_view(), name='edit_candidate'),
     path('candidates/delete/<int:pk>/', DeleteCandidateView.as_view(), name='delete_candidate'),
     path('voters/', VotersView.as_view(), name='voters'),
+    path('voters/json/', VotersJSONView.as_view(), name='voters_json'),
     path('voters/add/', AddVoterView.as_view(), name='add_voter'),
+    path('voters/import/', ImportVotersView.as_view(), name='import_voters'),
     path('voters/edit/<int:pk>/', EditVoterView.as_view(), name='edit_voter'),
     path('voters/delete/<int:pk>/', DeleteVoterView.as_view(), name='delete_voter'),
     path('results/', ResultsView.as_view(), name='results'),
     path('results/json/', ResultsJSONView.as_view(), name='results_json'),
+    path('results/stream/', ResultsStreamView.as_view(), name='results_stream'),
     path('results/download/pdf/', DownloadPDFView.as_view(), name='download_pdf'),
     path('results/download/word/', DownloadWordView.as_view(), name='download_word'),
+    path('export/<slug:dataset>.<slug:fmt>', ExportView.as_view(), name='export'),
+    path('avatar/', AvatarView.as_view(), name='avatar'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('settings/', SettingsView.as_view(), name='settings'),
     path('vote/', VoterDashboardView.as_view(), name='voter_dashboard'),
 ]
\ No newline at end of file
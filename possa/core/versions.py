@@ -0,0 +1,37 @@
+# election_project/election_app/versions.py
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+# Versions, login counters and other small state live in their own cache
+# (CACHES['state']), which is never culled to make room for rendered results.
+state_cache = ConnectionProxy(caches, 'state')
+
+
+def version_key(name):
+    return f'{name}:version'
+
+
+def current_version(name):
+    """Return the shared version of ``name``, a nanosecond timestamp kept in the state cache."""
+    version = state_cache.get(version_key(name))
+    if version is None:
+        version = bump_version(name)
+    return version
+
+
+async def acurrent_version(name):
+    version = await state_cache.aget(version_key(name))
+    if version is None:
+        version = await sync_to_async(bump_version)(name)
+    return version
+
+
+def bump_version(name):
+    # A fresh timestamp rather than incr(): two concurrent bumps can't
+    # collapse into one, and a lost version key just forces a recompute.
+    version = time.time_ns()
+    state_cache.set(version_key(name), version, None)
+    return version
@@ -1,68 +1,65 @@
 # election_project/election_app/views.py
-from django.shortcuts import render, redirect, get_object_or_404
+import mimetypes
+import os
+import posixpath
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.utils.decorators import method_decorator
 from django.contrib import messages
-from django.contrib.auth import authenticate, login as django_login, logout as django_logout
+from django.contrib.auth import logout as django_logout
 from django.contrib.auth.models import User
 from django.utils import timezone
-from django.db.models import Sum, Count
-from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.contrib.staticfiles.views import serve as serve_static
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.views.static import was_modified_since
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from .models import ElectionSetting, Candidate, Voter, ActivityLog
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
-from reportlab.lib import colors
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from io import BytesIO
-import datetime
+from .activity import log_activity
+from .auth import LoginFailed, aadmin_exists, admin_exists, alog_in, log_in
+from .assets import hashed_static_names
+from .avatars import AVATAR_MAX_AGE, avatar_svg
+from .election import aelection_open, election_open, election_settings
+from .exports import EXPORTS, FORMATS, export_lines
+from .imports import import_voters, read_rows
+from .metrics import REGISTRY
+from .listing import filter_candidates, filter_voters, keyset_page, page_url
+from .live import results_stream
+from .reports import REPORTS, open_report
+from .results import aindex_candidates, aresults_snapshot, index_candidates, results_snapshot, results_etag, results_last_modified
+from .routing import read_replica
+from .standings import apply_standings
+from .ballots import BALLOT_TIMEOUT, InvalidBallot, aballot_races, acandidates_version, ballot_races, candidates_version
+from .voting import cast_ballot, AlreadyVoted
 
 class IndexView(View):
     def get(self, request):
-        candidates = Candidate.objects.all()
-        total_votes = candidates.aggregate(total=Sum('votes'))['total'] or 0
-        for candidate in candidates:
-            candidate.percentage = round((candidate.votes / total_votes * 100) if total_votes > 0 else 0, 2)
-        return render(request, 'index.html', {'candidates': candidates})
+        return render(request, 'index.html', {'candidates': index_candidates()})
 
     def post(self, request):
-        role = request.POST.get('role')
-        password = request.POST.get('password')
-        if role == 'voter':
-            dept_id = request.POST.get('dept_id')
-            try:
-                voter = Voter.objects.get(dept_id=dept_id)
-                if voter.check_password(password):
-                    if voter.has_voted:
-                        messages.error(request, 'You have already voted')
-                    else:
-                        request.session['voter_id'] = voter.id
-                        return redirect('voter_dashboard')
-                else:
-                    messages.error(request, 'Invalid credentials')
-            except Voter.DoesNotExist:
-                messages.error(request, 'Invalid credentials')
-        elif role == 'admin':
-            username = request.POST.get('username')
-            user = authenticate(request, username=username, password=password)
-            if user is not None:
-                django_login(request, user)
-                return redirect('dashboard')
-            else:
-                messages.error(request, 'Invalid credentials')
+        try:
+            return redirect(log_in(request))
+        except LoginFailed as exc:
+            messages.error(request, str(exc))
         # Reload index with messages
         return self.get(request)
 
 class SetupAdminView(View):
     def get(self, request):
-        if User.objects.exists():
+        if admin_exists():
             return redirect('login')
         return render(request, 'setup_admin.html')
 
     def post(self, request):
-        if User.objects.exists():
+        if admin_exists():
             return redirect('login')
         username = request.POST.get('username')
         password = request.POST.get('password')
@@ -75,35 +72,15 @@ class SetupAdminView(View):
 
 class LoginView(View):
     def get(self, request):
-        if not User.objects.exists():
+        if not admin_exists():
             return redirect('setup_admin')
         return render(request, 'login.html')
 
     def post(self, request):
-        role = request.POST.get('role')
-        password = request.POST.get('password')
-        if role == 'voter':
-            dept_id = request.POST.get('dept_id')
-            try:
-                voter = Voter.objects.get(dept_id=dept_id)
-                if voter.check_password(password):
-                    if voter.has_voted:
-                        messages.error(request, 'You have already voted')
-                    else:
-                        request.session['voter_id'] = voter.id
-                        return redirect('voter_dashboard')
-                else:
-                    messages.error(request, 'Invalid credentials')
-            except Voter.DoesNotExist:
-                messages.error(request, 'Invalid credentials')
-        elif role == 'admin':
-            username = request.POST.get('username')
-            user = authenticate(request, username=username, password=password)
-            if user is not None:
-                django_login(request, user)
-                return redirect('dashboard')
-            else:
-                messages.error(request, 'Invalid credentials')
+        try:
+            return redirect(log_in(request))
+        except LoginFailed as exc:
+            messages.error(request, str(exc))
         return render(request, 'login.html')
 
 class LogoutView(View):
@@ -113,28 +90,22 @@ class LogoutView(View):
         return redirect('login')
 
 class DashboardView(View):
+    # Read-only: standings come from the results snapshot, computed once per tally change.
     def get(self, request):
         if not request.user.is_authenticated:
             return redirect('login')
-        settings = ElectionSetting.objects.first() or ElectionSetting.objects.create()
-        candidates = Candidate.objects.all()
-        voters = Voter.objects.all()
-        activities = ActivityLog.objects.order_by('-time')[:4]
-        total_candidates = candidates.count()
-        total_voters = voters.count()
-        votes_cast = candidates.aggregate(total=Sum('votes'))['total'] or 0
-        participation = round((votes_cast / total_voters * 100) if total_voters > 0 else 0)
+        settings = election_settings()
+        snapshot = results_snapshot()
+        with read_replica():
+            activities = list(ActivityLog.objects.order_by('-time')[:4])
+        candidates = snapshot['candidates']
+        total_voters = snapshot['total_voters']
+        votes_cast = sum(c['votes'] for c in candidates)
+        participation = round((snapshot['total_voted'] / total_voters * 100) if total_voters > 0 else 0)
         election_status = self.get_election_status(settings)
-        # Update candidate statuses
-        if votes_cast > 0:
-            max_votes = candidates.aggregate(max=Sum('votes'))['max']
-            for c in candidates:
-                c.status = 'Leading' if c.votes == max_votes else 'Running'
-                c.status_color = 'green' if c.votes == max_votes else 'blue'
-                c.save()
         context = {
             'settings': settings,
-            'total_candidates': total_candidates,
+            'total_candidates': len(candidates),
             'total_voters': total_voters,
             'votes_cast': votes_cast,
             'participation': participation,
@@ -158,11 +129,36 @@ class CandidatesView(View):
     def get(self, request):
         if not request.user.is_authenticated:
             return redirect('login')
-        candidates = Candidate.objects.all()
-        total_votes = Candidate.objects.aggregate(total=Sum('votes'))['total'] or 0
-        context = {'candidates': candidates, 'total_votes': total_votes}
+        candidates, next_cursor, prev_cursor = keyset_page(filter_candidates(request.GET), request.GET)
+        snapshot = results_snapshot()
+        apply_standings(candidates, snapshot)
+        total_votes = sum(c['votes'] for c in snapshot['candidates'])
+        for candidate in candidates:
+            candidate.percentage = round((candidate.votes / total_votes * 100) if total_votes > 0 else 0, 2)
+        context = {
+            'candidates': candidates,
+            'total_votes': total_votes,
+            'filters': request.GET,
+            'next_url': page_url(request, after=next_cursor) if next_cursor else None,
+            'prev_url': page_url(request, before=prev_cursor) if prev_cursor else None,
+        }
         return render(request, 'candidates.html', context)
 
+class CandidatesJSONView(View):
+    def get(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Unauthorized'}, status=401)
+        candidates, next_cursor, _ = keyset_page(filter_candidates(request.GET), request.GET)
+        apply_standings(candidates, results_snapshot())
+        return JsonResponse({
+            'results': [
+                {'id': c.id, 'name': c.name, 'department': c.department, 'position': c.position, 'votes': c.votes,
+                 'status': c.status, 'photo': c.photo_variants['src'] if c.photo else None}
+                for c in candidates
+            ],
+            'next': next_cursor,
+        })
+
 class AddCandidateView(View):
     def post(self, request):
         if not request.user.is_authenticated:
@@ -174,7 +170,7 @@ class AddCandidateView(View):
         party_photo = request.FILES.get('candidate-party-photo')
         candidate = Candidate(name=name, department=department, position=position, photo=photo, party_photo=party_photo)
         candidate.save()
-        ActivityLog.objects.create(type='Candidate added', description=f'{name} added as candidate', icon='fa-user-tie', color='purple')
+        log_activity(type='Candidate added', description=f'{name} added as candidate', icon='fa-user-tie', color='purple')
         messages.success(request, 'Candidate added successfully')
         return redirect('candidates')
 
@@ -191,7 +187,7 @@ class EditCandidateView(View):
         if 'candidate-party-photo' in request.FILES:
             candidate.party_photo = request.FILES['candidate-party-photo']
         candidate.save()
-        ActivityLog.objects.create(type='Candidate updated', description=f'{candidate.name} details updated', icon='fa-edit', color='blue')
+        log_activity(type='Candidate updated', description=f'{candidate.name} details updated', icon='fa-edit', color='blue')
         messages.success(request, 'Candidate updated successfully')
         return redirect('candidates')
 
@@ -202,7 +198,7 @@ class DeleteCandidateView(View):
         candidate = get_object_or_404(Candidate, pk=pk)
         name = candidate.name
         candidate.delete()
-        ActivityLog.objects.create(type='Candidate removed', description=f'{name} removed from candidates', icon='fa-trash', color='red')
+        log_activity(type='Candidate removed', description=f'{name} removed from candidates', icon='fa-trash', color='red')
         messages.success(request, 'Candidate deleted successfully')
         return redirect('candidates')
 
@@ -210,8 +206,31 @@ class VotersView(View):
     def get(self, request):
         if not request.user.is_authenticated:
             return redirect('login')
-        voters = Voter.objects.all()
-        return render(request, 'voters.html', {'voters': voters})
+        voters, next_cursor, prev_cursor = keyset_page(filter_voters(request.GET), request.GET)
+        context = {
+            'voters': voters,
+            'filters': request.GET,
+            'status_choices': Voter._meta.get_field('status').choices,
+            'major_minor_choices': Voter._meta.get_field('major_minor').choices,
+            'next_url': page_url(request, after=next_cursor) if next_cursor else None,
+            'prev_url': page_url(request, before=prev_cursor) if prev_cursor else None,
+        }
+        return render(request, 'voters.html', context)
+
+class VotersJSONView(View):
+    def get(self, request):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Unauthorized'}, status=401)
+        voters, next_cursor, _ = keyset_page(filter_voters(request.GET), request.GET)
+        return JsonResponse({
+            'results': [
+                {'id': v.id, 'name': v.name, 'sex': v.sex, 'status': v.status, 'major_minor': v.major_minor,
+                 'department': v.department, 'dept_id': v.dept_id, 'has_voted': v.has_voted,
+                 'photo': v.photo.url if v.photo else None}
+                for v in voters
+            ],
+            'next': next_cursor,
+        })
 
 class AddVoterView(View):
     def post(self, request):
@@ -227,10 +246,30 @@ class AddVoterView(View):
         photo = request.FILES.get('voter-photo')
         voter = Voter(name=name, sex=sex, status=status, major_minor=major_minor, department=department, dept_id=dept_id, photo=photo)
         voter.set_password(password)
-        ActivityLog.objects.create(type='New voter registered', description=f'{name} just registered to vote', icon='fa-user-plus', color='green')
+        log_activity(type='New voter registered', description=f'{name} just registered to vote', icon='fa-user-plus', color='green')
         messages.success(request, 'Voter added successfully')
         return redirect('voters')
 
+class ImportVotersView(View):
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return redirect('login')
+        upload = request.FILES.get('voter-roll')
+        if not upload:
+            messages.error(request, 'Please choose a CSV or XLSX file')
+            return redirect('voters')
+        try:
+            report = import_voters(read_rows(upload.file, upload.name), source=upload.name)
+        except (ValueError, UnicodeDecodeError) as exc:
+            messages.error(request, f'Could not read {upload.name}: {exc}')
+            return redirect('voters')
+        messages.success(request, f'{report.created} of {report.rows} voters imported')
+        for line, problem in report.errors[:10]:
+            messages.error(request, f'Row {line}: {problem}')
+        if len(report.errors) > 10:
+            messages.error(request, f'... and {len(report.errors) - 10} more rows with errors')
+        return redirect('voters')
+
 class EditVoterView(View):
     def post(self, request, pk):
         if not request.user.is_authenticated:
@@ -247,7 +286,7 @@ class EditVoterView(View):
         if 'voter-photo' in request.FILES:
             voter.photo = request.FILES['voter-photo']
         voter.save()
-        ActivityLog.objects.create(type='Voter updated', description=f'{voter.name} details updated', icon='fa-edit', color='blue')
+        log_activity(type='Voter updated', description=f'{voter.name} details updated', icon='fa-edit', color='blue')
         messages.success(request, 'Voter updated successfully')
         return redirect('voters')
 
@@ -258,183 +297,150 @@ class DeleteVoterView(View):
         voter = get_object_or_404(Voter, pk=pk)
         name = voter.name
         voter.delete()
-        ActivityLog.objects.create(type='Voter removed', description=f'{name} removed from voters', icon='fa-trash', color='red')
+        log_activity(type='Voter removed', description=f'{name} removed from voters', icon='fa-trash', color='red')
         messages.success(request, 'Voter deleted successfully')
         return redirect('voters')
 
+# Results responses change only when the results version does: let clients
+# revalidate and answer 304 without building the body.
+results_conditional = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=results_etag, last_modified_func=results_last_modified),
+]
+
 class ResultsView(View):
     def get(self, request):
         if not request.user.is_authenticated:
             return redirect('login')
-        candidates = Candidate.objects.all()
-        year_counts = Voter.objects.filter(has_voted=True).values('status').annotate(count=Count('status'))
-        major_counts = Voter.objects.filter(has_voted=True).values('major_minor').annotate(count=Count('major_minor'))
-        total_voted = Voter.objects.filter(has_voted=True).count()
-        year_percent = {item['status']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in year_counts}
-        major_percent = {item['major_minor']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in major_counts}
+        snapshot = results_snapshot()
+        candidates = snapshot['candidates']
+        year_percent = snapshot['year_percent']
+        major_percent = snapshot['major_percent']
         context = {
             'candidates': candidates,
             'year_percent': year_percent,
             'major_percent': major_percent,
+            'live_stream': isinstance(request, ASGIRequest),
         }
         return render(request, 'results.html', context)
 
+@method_decorator(results_conditional, name='get')
 class ResultsJSONView(View):
     def get(self, request):
         if not request.user.is_authenticated:
             return JsonResponse({'error': 'Unauthorized'}, status=401)
-        candidates = list(Candidate.objects.values('name', 'votes'))
-        year_counts = list(Voter.objects.filter(has_voted=True).values('status').annotate(count=Count('status')))
-        major_counts = list(Voter.objects.filter(has_voted=True).values('major_minor').annotate(count=Count('major_minor')))
-        total_voted = Voter.objects.filter(has_voted=True).count()
-        year_percent = {item['status']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in year_counts}
-        major_percent = {item['major_minor']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in major_counts}
+        snapshot = results_snapshot()
         return JsonResponse({
-            'candidates': candidates,
-            'year_percent': year_percent,
-            'major_percent': major_percent,
+            'candidates': snapshot['candidates'],
+            'year_percent': snapshot['year_percent'],
+            'major_percent': snapshot['major_percent'],
         })
 
-class DownloadPDFView(View):
+class ResultsStreamView(View):
+    # Server-sent events; needs an ASGI server (election/asgi.py) to hold many
+    # subscribers cheaply. Under WSGI the stream would be buffered forever, so
+    # answer 204, which tells EventSource not to reconnect.
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse(status=204)
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({'error': 'Unauthorized'}, status=401)
+        response = StreamingHttpResponse(results_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+class ReportDownloadView(View):
+    # Reports are rendered once per results version and then streamed from disk.
+    kind = None
+    content_type = None
+
     def get(self, request):
         if not request.user.is_authenticated:
             return redirect('login')
-        candidates = Candidate.objects.all()
-        year_counts = Voter.objects.filter(has_voted=True).values('status').annotate(count=Count('status'))
-        major_counts = Voter.objects.filter(has_voted=True).values('major_minor').annotate(count=Count('major_minor'))
-        total_voted = Voter.objects.filter(has_voted=True).count()
-        year_percent = {item['status']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in year_counts}
-        major_percent = {item['major_minor']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in major_counts}
-
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        story.append(Paragraph('Election Results Report', styles['Title']))
-        story.append(Paragraph(f'Generated on: {datetime.date.today()}', styles['Normal']))
-        story.append(Paragraph('', styles['Normal']))  # Spacer
-
-        story.append(Paragraph('Candidates Results', styles['Heading2']))
-        candidate_data = [['Name', 'Votes']]
-        for candidate in candidates:
-            candidate_data.append([candidate.name, candidate.votes])
-        candidate_table = Table(candidate_data)
-        candidate_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(candidate_table)
-        story.append(Paragraph('', styles['Normal']))  # Spacer
-
-        story.append(Paragraph('Votes by Year Level (%)', styles['Heading2']))
-        year_data = [['Year Level', 'Percentage']]
-        for key, value in year_percent.items():
-            year_data.append([key, f'{value}%'])
-        year_table = Table(year_data)
-        year_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(year_table)
-        story.append(Paragraph('', styles['Normal']))  # Spacer
-
-        story.append(Paragraph('Votes by Major/Minor (%)', styles['Heading2']))
-        major_data = [['Type', 'Percentage']]
-        for key, value in major_percent.items():
-            major_data.append([key, f'{value}%'])
-        major_table = Table(major_data)
-        major_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(major_table)
-
-        doc.build(story)
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="election_results.pdf"'
-        return response
+        report = open_report(self.kind, results_snapshot())
+        return FileResponse(report, as_attachment=True, filename=REPORTS[self.kind][2], content_type=self.content_type)
 
-class DownloadWordView(View):
-    def get(self, request):
+@method_decorator(results_conditional, name='get')
+class DownloadPDFView(ReportDownloadView):
+    kind = 'pdf'
+    content_type = 'application/pdf'
+
+@method_decorator(results_conditional, name='get')
+class DownloadWordView(ReportDownloadView):
+    kind = 'word'
+    content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+class ExportView(View):
+    def get(self, request, dataset, fmt):
         if not request.user.is_authenticated:
             return redirect('login')
-        candidates = Candidate.objects.all()
-        year_counts = Voter.objects.filter(has_voted=True).values('status').annotate(count=Count('status'))
-        major_counts = Voter.objects.filter(has_voted=True).values('major_minor').annotate(count=Count('major_minor'))
-        total_voted = Voter.objects.filter(has_voted=True).count()
-        year_percent = {item['status']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in year_counts}
-        major_percent = {item['major_minor']: round(item['count'] / total_voted * 100, 1) if total_voted > 0 else 0 for item in major_counts}
-
-        doc = Document()
-        doc.add_heading('Election Results Report', level=1).alignment = WD_ALIGN_PARAGRAPH.CENTER
-        doc.add_paragraph(f'Generated on: {datetime.date.today()}')
-
-        doc.add_heading('Candidates Results', level=2)
-        table = doc.add_table(rows=1, cols=2)
-        table.style = 'Table Grid'
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = 'Name'
-        hdr_cells[1].text = 'Votes'
-        for candidate in candidates:
-            row_cells = table.add_row().cells
-            row_cells[0].text = candidate.name
-            row_cells[1].text = str(candidate.votes)
-
-        doc.add_heading('Votes by Year Level (%)', level=2)
-        table = doc.add_table(rows=1, cols=2)
-        table.style = 'Table Grid'
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = 'Year Level'
-        hdr_cells[1].text = 'Percentage'
-        for key, value in year_percent.items():
-            row_cells = table.add_row().cells
-            row_cells[0].text = key
-            row_cells[1].text = f'{value}%'
-
-        doc.add_heading('Votes by Major/Minor (%)', level=2)
-        table = doc.add_table(rows=1, cols=2)
-        table.style = 'Table Grid'
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = 'Type'
-        hdr_cells[1].text = 'Percentage'
-        for key, value in major_percent.items():
-            row_cells = table.add_row().cells
-            row_cells[0].text = key
-            row_cells[1].text = f'{value}%'
-
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-        response['Content-Disposition'] = 'attachment; filename="election_results.docx"'
+        if dataset not in EXPORTS or fmt not in FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(export_lines(dataset, fmt), content_type=FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+        return response
+
+@method_decorator(cache_control(public=True, max_age=AVATAR_MAX_AGE, immutable=True), name='get')
+class AvatarView(View):
+    # Initials avatar for people without a photo; the URL fully determines the image.
+    def get(self, request):
+        svg, etag = avatar_svg(request.GET.get('name', '')[:100], request.GET.get('background'), request.GET.get('color'))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(svg, content_type='image/svg+xml')
+        response['ETag'] = etag
+        response['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'"
         return response
 
+class StaticFileView(View):
+    # Collected static files, gzipped when the client accepts it (see core.storage).
+    # Hashed names never change content, so browsers may keep them for a year.
+    def get(self, request, path):
+        path = posixpath.normpath(path).lstrip('/')
+        try:
+            full_path = safe_join(settings.STATIC_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404
+        if not os.path.isfile(full_path):
+            if settings.DEBUG:
+                return serve_static(request, path)
+            raise Http404
+        stat = os.stat(full_path)
+        immutable = path in hashed_static_names()
+        if not immutable and not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+            return HttpResponseNotModified()
+        content_type, _ = mimetypes.guess_type(full_path)
+        if 'gzip' in request.headers.get('Accept-Encoding', '') and os.path.isfile(full_path + '.gz'):
+            response = FileResponse(open(full_path + '.gz', 'rb'), content_type=content_type or 'application/octet-stream')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if immutable:
+            patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=settings.STATIC_MAX_AGE)
+            response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        return response
+
+class MetricsView(View):
+    def get(self, request):
+        if not settings.METRICS_ENABLED:
+            raise Http404
+        if not request.user.is_staff and request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+            return HttpResponse(status=403)
+        return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 class SettingsView(View):
     def get(self, request):
         if not request.user.is_authenticated:
             return redirect('login')
-        settings = ElectionSetting.objects.first() or ElectionSetting.objects.create()
-        return render(request, 'settings.html', {'settings': settings})
+        return render(request, 'settings.html', {'settings': election_settings()})
 
     def post(self, request):
-        settings = ElectionSetting.objects.first() or ElectionSetting.objects.create()
+        settings = ElectionSetting.load()
         settings.admin_name = request.POST.get('admin-name-input', settings.admin_name)
         settings.admin_role = request.POST.get('admin-role-input', settings.admin_role)
         if 'admin-photo' in request.FILES:
@@ -451,9 +457,7 @@ class VoterDashboardView(View):
         if not voter_id:
             return redirect('login')
         voter = get_object_or_404(Voter, id=voter_id)
-        settings = ElectionSetting.objects.first()
-        now = timezone.now()
-        if now < settings.start_date or now > settings.end_date:
+        if not election_open():
             messages.error(request, 'Election is not ongoing')
             del request.session['voter_id']
             return redirect('login')
@@ -461,23 +465,114 @@ class VoterDashboardView(View):
             messages.error(request, 'You have already voted')
             del request.session['voter_id']
             return redirect('login')
-        candidates = Candidate.objects.all()
-        return render(request, 'voter_dashboard.html', {'candidates': candidates})
+        # The ballot fragment is cached per candidate set, so ballot_races is
+        # only called (by the template) when the fragment has to be rebuilt.
+        return render(request, 'voter_dashboard.html', {
+            'races': ballot_races, 'ballot_version': candidates_version(), 'ballot_timeout': BALLOT_TIMEOUT,
+        })
 
     def post(self, request):
         voter_id = request.session.get('voter_id')
         if not voter_id:
             return redirect('login')
         voter = get_object_or_404(Voter, id=voter_id)
-        candidate_id = request.POST.get('candidate')
-        if not candidate_id:
-            messages.error(request, 'Please select a candidate')
+        selections = {key[len('ballot-'):]: value for key, value in request.POST.items() if key.startswith('ballot-') and value}
+        try:
+            cast_ballot(voter, selections)
+        except InvalidBallot as exc:
+            messages.error(request, str(exc))
             return self.get(request)
-        candidate = get_object_or_404(Candidate, id=candidate_id)
-        candidate.votes += 1
-        candidate.save()
-        voter.has_voted = True
-        voter.save()
-        ActivityLog.objects.create(type='Vote recorded', description=f'Vote cast for {candidate.name} by {voter.name}', icon='fa-vote-yea', color='blue')
+        except AlreadyVoted:
+            messages.error(request, 'You have already voted')
+            del request.session['voter_id']
+            return redirect('login')
         del request.session['voter_id']
-        return render(request, 'voter_dashboard.html', {'success': True})
\ No newline at end of file
+        return render(request, 'voter_dashboard.html', {'success': True})
+
+
+# Async variants of the voter-facing hot path, routed in place of the views
+# above when ASYNC_VIEWS is on; serve them with election/asgi.py. Waiting on
+# the database or the hasher then holds a coroutine rather than a thread.
+
+class AsyncIndexView(View):
+    async def get(self, request):
+        return render(request, 'index.html', {'candidates': await aindex_candidates()})
+
+    async def post(self, request):
+        try:
+            return redirect(await alog_in(request))
+        except LoginFailed as exc:
+            messages.error(request, str(exc))
+        return await self.get(request)
+
+class AsyncLoginView(View):
+    async def get(self, request):
+        if not await aadmin_exists():
+            return redirect('setup_admin')
+        return render(request, 'login.html')
+
+    async def post(self, request):
+        try:
+            return redirect(await alog_in(request))
+        except LoginFailed as exc:
+            messages.error(request, str(exc))
+        return render(request, 'login.html')
+
+class AsyncVoterDashboardView(View):
+    async def get(self, request):
+        voter_id = await request.session.aget('voter_id')
+        if not voter_id:
+            return redirect('login')
+        voter = await aget_object_or_404(Voter, id=voter_id)
+        if not await aelection_open():
+            messages.error(request, 'Election is not ongoing')
+            await request.session.apop('voter_id')
+            return redirect('login')
+        if voter.has_voted:
+            messages.error(request, 'You have already voted')
+            await request.session.apop('voter_id')
+            return redirect('login')
+        # Rebuilding the fragment can't query from here, so the races are always loaded.
+        return render(request, 'voter_dashboard.html', {
+            'races': await aballot_races(), 'ballot_version': await acandidates_version(), 'ballot_timeout': BALLOT_TIMEOUT,
+        })
+
+    async def post(self, request):
+        voter_id = await request.session.aget('voter_id')
+        if not voter_id:
+            return redirect('login')
+        voter = await aget_object_or_404(Voter, id=voter_id)
+        selections = {key[len('ballot-'):]: value for key, value in request.POST.items() if key.startswith('ballot-') and value}
+        try:
+            await sync_to_async(cast_ballot)(voter, selections)
+        except InvalidBallot as exc:
+            messages.error(request, str(exc))
+            return await self.get(request)
+        except AlreadyVoted:
+            messages.error(request, 'You have already voted')
+            await request.session.apop('voter_id')
+            return redirect('login')
+        await request.session.apop('voter_id')
+        return render(request, 'voter_dashboard.html', {'success': True})
+
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+class AsyncResultsJSONView(View):
+    # condition() calls its validators synchronously, which can't load the
+    # user here, so the conditional response is built by hand.
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({'error': 'Unauthorized'}, status=401)
+        snapshot = await aresults_snapshot()
+        etag = quote_etag(str(snapshot['version']))
+        last_modified = snapshot['version'] // 10**9
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = JsonResponse({
+                'candidates': snapshot['candidates'],
+                'year_percent': snapshot['year_percent'],
+                'major_percent': snapshot['major_percent'],
+            })
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        return response
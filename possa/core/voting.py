@@ -0,0 +1,41 @@
+# election_project/election_app/voting.py
+from django.db import IntegrityError, transaction
+
+from .activity import log_activity
+from .ballots import InvalidBallot, validate_ballot
+from .models import Ballot, Voter
+from .results import bump_results_version
+from .tallies import tally_folder
+
+
+class AlreadyVoted(Exception):
+    pass
+
+
+def cast_ballot(voter, selections):
+    """Record a voter's ballot, ``{position: candidate id}``, atomically.
+
+    Choices are validated against the cached ballot before any write. The
+    voter flag is flipped with a conditional UPDATE so two concurrent
+    submissions for the same voter can't both succeed, and every race is
+    appended to the ballot ledger in one bulk insert. No shared counter is
+    touched: after commit ``core.tallies.tally_folder`` folds the new ballots
+    into the tallies in the background, and the activity entry is queued
+    for a batched write.
+    """
+    chosen = validate_ballot(selections)
+    try:
+        with transaction.atomic():
+            if not Voter.objects.filter(pk=voter.pk, has_voted=False).update(has_voted=True):
+                raise AlreadyVoted
+            Ballot.objects.bulk_create([
+                Ballot(voter=voter, candidate_id=c['id'], position=c['position']) for c in chosen
+            ])
+            names = ', '.join(c['name'] for c in chosen)
+            log_activity(type='Vote recorded', description=f'Vote cast for {names} by {voter.name}', icon='fa-vote-yea', color='blue')
+            transaction.on_commit(bump_results_version)
+            transaction.on_commit(tally_folder.schedule)
+    except IntegrityError:
+        # A candidate was removed after the cached ballot was built.
+        raise InvalidBallot('The ballot has changed, please vote again')
+    voter.has_voted = True
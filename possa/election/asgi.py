@@ -2,6 +2,10 @@
 ASGI config for election project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn election.asgi:application``) so
+the live results stream at ``results/stream/`` can hold many open connections.
+Set ASYNC_VIEWS=1 to also serve the login, ballot and results JSON views as
+async views.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -3,10 +3,12 @@ school_management URL Configuration
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import StaticFileView
+
 urlpatterns = [
     # Admin panel
     path('admin/', admin.site.urls),
@@ -16,7 +18,11 @@ urlpatterns = [
     path('students/', include('core.urls')),
 ]
 
-# Serve media and static files during development
+# Static files come from STATIC_ROOT (falling back to the app directories
+# under DEBUG) unless a web server in front handles them.
+if settings.SERVE_STATIC:
+    urlpatterns += [re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), StaticFileView.as_view())]
+
+# Serve media files during development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)